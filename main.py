@@ -1,6 +1,10 @@
+import atexit
 import base64
 import io
 import json
+import logging
+import logging.handlers
+import sys
 import time
 import requests
 import threading
@@ -16,9 +20,20 @@ from voice import RealTimeVoiceRecognizer, RemoteVoiceRecognizer
 from config_manager import ConfigManager
 from persona_manager import PersonaManager
 
+# 解析ループ・XML出力スレッド用のロガー（出力はQueueListenerのスレッドで行う）
+logger = logging.getLogger("ovex")
+_log_listener = None
+
 # デフォルトのXMLファイルパス（プロジェクト直下の相対パス）
 DEFAULT_XML_PATH = "comment.xml"
 
+# XMLの終了タグと、末尾から終了タグを探す際に読み込むバイト数
+XML_CLOSING_TAG = b'</log>'
+XML_TAIL_READ_SIZE = 64
+
+# テキストモードで作成したXMLファイルと改行コードを揃える
+XML_LINE_END = os.linesep.encode('ascii')
+
 class OllamaVisionExplainer:
     def __init__(self, ollama_url="http://localhost:11434", model_name="gemma3:12b", comment_model_name="deepseek-r1:8b", xml_file=DEFAULT_XML_PATH, prompt_file="prompt.md", enable_voice=True, debug_mode=False, compression_ratio=2.0, jpeg_quality=75, voice_server_url=None, persona_config=None):
         """
@@ -36,6 +51,9 @@ class OllamaVisionExplainer:
             jpeg_quality: JPEG品質 (1-100, デフォルト: 75)
             voice_server_url: リモート音声認識サーバーのURL (Noneの場合はローカル音声認識を使用)
         """
+        # 出力はすべてロガー経由で行うため、起動方法によらずここでハンドラーを設定する
+        setup_logging()
+        
         self.ollama_url = ollama_url
         self.model_name = model_name
         self.comment_model_name = comment_model_name
@@ -124,12 +142,12 @@ class OllamaVisionExplainer:
             # デバッグモードの場合、リサイズ情報を表示
             if self.debug_mode:
                 actual_compression = (original_size[0] * original_size[1]) / (resized_size[0] * resized_size[1])
-                print(f"[画像圧縮] {original_size} → {resized_size} (面積圧縮率: {actual_compression:.2f}x)")
+                logger.info(f"[画像圧縮] {original_size} → {resized_size} (面積圧縮率: {actual_compression:.2f}x)")
             
             return image
             
         except Exception as e:
-            print(f"画像圧縮エラー: {e}")
+            logger.error(f"画像圧縮エラー: {e}")
             return image
 
     def load_prompt(self):
@@ -142,13 +160,13 @@ class OllamaVisionExplainer:
         try:
             with open(self.prompt_file, 'r', encoding='utf-8') as f:
                 content = f.read()
-            print(f"プロンプトファイルを読み込みました: {self.prompt_file}")
+            logger.info(f"プロンプトファイルを読み込みました: {self.prompt_file}")
             return content
         except FileNotFoundError:
-            print(f"プロンプトファイルが見つかりません: {self.prompt_file}")
+            logger.warning(f"プロンプトファイルが見つかりません: {self.prompt_file}")
             return ""
         except Exception as e:
-            print(f"プロンプトファイル読み込みエラー: {e}")
+            logger.error(f"プロンプトファイル読み込みエラー: {e}")
             return ""
     
     def init_voice_recognition(self):
@@ -157,21 +175,21 @@ class OllamaVisionExplainer:
         """
         try:
             if self.voice_server_url:
-                print(f"🎤 リモート音声認識サーバーに接続中... ({self.voice_server_url})")
+                logger.info(f"🎤 リモート音声認識サーバーに接続中... ({self.voice_server_url})")
                 self.voice_recognizer = RemoteVoiceRecognizer(server_url=self.voice_server_url)
                 
                 # サーバーの生存確認
                 if not self.voice_recognizer.is_available():
                     raise Exception(f"音声認識サーバーに接続できませんでした: {self.voice_server_url}")
                     
-                print("[OK] リモート音声認識システムに接続しました")
+                logger.info("[OK] リモート音声認識システムに接続しました")
             else:
-                print("🎤 ローカル音声認識システムを初期化中...")
+                logger.info("🎤 ローカル音声認識システムを初期化中...")
                 self.voice_recognizer = RealTimeVoiceRecognizer(model_name="medium")
-                print("[OK] ローカル音声認識システムの初期化が完了しました")
+                logger.info("[OK] ローカル音声認識システムの初期化が完了しました")
                 
         except Exception as e:
-            print(f"[Warning] 音声認識システムの初期化に失敗しました: {e}")
+            logger.warning(f"[Warning] 音声認識システムの初期化に失敗しました: {e}")
             self.enable_voice = False
     
     def start_voice_recognition(self):
@@ -184,25 +202,23 @@ class OllamaVisionExplainer:
         try:
             if isinstance(self.voice_recognizer, RemoteVoiceRecognizer):
                 # リモート音声認識の場合
-                print("🎤 リモート音声認識を開始します...")
+                logger.info("🎤 リモート音声認識を開始します...")
                 if self.voice_recognizer.start_recording():
-                    print("リモート音声認識が開始されました")
+                    logger.info("リモート音声認識が開始されました")
                     return True
                 else:
-                    print("リモート音声認識の開始に失敗しました")
+                    logger.error("リモート音声認識の開始に失敗しました")
                     return False
             else:
                 # ローカル音声認識の場合
                 def voice_thread():
-                    print("🎤 音声認識を開始します...")
+                    logger.info("🎤 音声認識を開始します...")
                     if self.voice_recognizer.start_recording():
-                        self.voice_recognizer.is_processing = True
-                        processing_thread = threading.Thread(target=self.voice_recognizer.processing_thread)
-                        processing_thread.daemon = True
-                        processing_thread.start()
-                        print("音声認識が開始されました")
+                        # 前回の処理スレッドが残っていれば終了を待ってから開始
+                        self.voice_recognizer.start_processing()
+                        logger.info("音声認識が開始されました")
                     else:
-                        print("音声認識の開始に失敗しました")
+                        logger.error("音声認識の開始に失敗しました")
                 
                 self.voice_thread = threading.Thread(target=voice_thread)
                 self.voice_thread.daemon = True
@@ -211,7 +227,7 @@ class OllamaVisionExplainer:
                 return True
             
         except Exception as e:
-            print(f"音声認識開始エラー: {e}")
+            logger.error(f"音声認識開始エラー: {e}")
             return False
     
     def stop_voice_recognition(self):
@@ -225,11 +241,11 @@ class OllamaVisionExplainer:
                     self.voice_recognizer.stop_recording()
                 else:
                     # ローカル音声認識の場合
-                    self.voice_recognizer.is_processing = False
+                    self.voice_recognizer.stop_processing()
                     self.voice_recognizer.stop_recording()
-                print("[Mute] 音声認識を停止しました")
+                logger.info("[Mute] 音声認識を停止しました")
             except Exception as e:
-                print(f"音声認識停止エラー: {e}")
+                logger.error(f"音声認識停止エラー: {e}")
     
     def get_voice_context(self):
         """
@@ -262,7 +278,7 @@ class OllamaVisionExplainer:
             return voice_content.strip()
             
         except Exception as e:
-            print(f"音声コンテキスト取得エラー: {e}")
+            logger.error(f"音声コンテキスト取得エラー: {e}")
             return ""
     
     def get_active_window_screenshot(self):
@@ -277,7 +293,7 @@ class OllamaVisionExplainer:
             active_window = gw.getActiveWindow()
             
             if active_window is None:
-                print("アクティブウィンドウが見つかりません")
+                logger.info("アクティブウィンドウが見つかりません")
                 return None
             
             # ウィンドウの座標とサイズを取得
@@ -289,7 +305,7 @@ class OllamaVisionExplainer:
             return screenshot
             
         except Exception as e:
-            print(f"スクリーンショット取得エラー: {e}")
+            logger.error(f"スクリーンショット取得エラー: {e}")
             return None
     
     def image_to_base64(self, image):
@@ -322,12 +338,12 @@ class OllamaVisionExplainer:
             # ファイルサイズ情報を表示
             file_size_kb = len(buffer.getvalue()) / 1024
             if self.debug_mode:
-                print(f"[JPEG圧縮] 品質: {self.jpeg_quality}, サイズ: {file_size_kb:.1f}KB")
+                logger.info(f"[JPEG圧縮] 品質: {self.jpeg_quality}, サイズ: {file_size_kb:.1f}KB")
             
             image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
             return image_base64
         except Exception as e:
-            print(f"画像エンコードエラー: {e}")
+            logger.error(f"画像エンコードエラー: {e}")
             return None
     
     def save_debug_image(self, image):
@@ -353,11 +369,11 @@ class OllamaVisionExplainer:
             
             # 画像を保存
             image.save(filepath, format='PNG')
-            print(f"[Image] デバッグ用画像を保存しました: {filepath}")
+            logger.info(f"[Image] デバッグ用画像を保存しました: {filepath}")
             
             return filepath
         except Exception as e:
-            print(f"デバッグ画像保存エラー: {e}")
+            logger.error(f"デバッグ画像保存エラー: {e}")
             return None
     
     def create_prompt_with_prompt(self, base_prompt):
@@ -410,7 +426,7 @@ class OllamaVisionExplainer:
             
             if self.debug_mode:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                print(f"[DEBUG][画像解析] [{timestamp}] {analysis_text}")
+                logger.info(f"[DEBUG][画像解析] [{timestamp}] {analysis_text}")
                 
                 # ログファイルに保存
                 if self.debug_log_file:
@@ -498,9 +514,9 @@ class OllamaVisionExplainer:
             
             # デバッグ出力を追加
             if self.debug_mode:
-                print(f"[DEBUG] コメント生成モデル: {self.comment_model_name}")
-                print(f"[DEBUG] 送信するプロンプト (最初の800文字):\n{enhanced_prompt[:800]}...")
-                print(f"[DEBUG] プロンプト全体の文字数: {len(enhanced_prompt)}")
+                logger.info(f"[DEBUG] コメント生成モデル: {self.comment_model_name}")
+                logger.info(f"[DEBUG] 送信するプロンプト (最初の800文字):\n{enhanced_prompt[:800]}...")
+                logger.info(f"[DEBUG] プロンプト全体の文字数: {len(enhanced_prompt)}")
             
             headers = {
                 "Content-Type": "application/json"
@@ -514,7 +530,7 @@ class OllamaVisionExplainer:
             
             # デバッグ: 生のレスポンスを確認
             if self.debug_mode:
-                print(f"[DEBUG] Ollamaからの生レスポンス:\n{raw_response}")
+                logger.info(f"[DEBUG] Ollamaからの生レスポンス:\n{raw_response}")
             
             # JSONレスポンスを解析（選択された人格情報を渡す）
             expected_persona_ids = [persona.persona_id for persona in selected_personas] if 'selected_personas' in locals() else None
@@ -558,7 +574,7 @@ class OllamaVisionExplainer:
                     if received_keys.intersection(expected_keys):
                         return parsed_json
                     else:
-                        print(f"[Warning] 期待される人格が見つかりません。期待: {expected_persona_ids}, 受信: {list(received_keys)}")
+                        logger.warning(f"[Warning] 期待される人格が見つかりません。期待: {expected_persona_ids}, 受信: {list(received_keys)}")
                         return parsed_json  # エラーにせず、そのまま返す（後続処理で適切にフィルタされる）
                 
                 # 従来の固定人格システム（後方互換性）
@@ -595,14 +611,14 @@ class OllamaVisionExplainer:
                             # 新形式の部分的な人格データとしてそのまま返す
                             return parsed_json
                     else:
-                        print(f"[Warning] 未知の人格構造: {received_keys}")
+                        logger.warning(f"[Warning] 未知の人格構造: {received_keys}")
                         return parsed_json  # そのまま返して後続処理に委ねる
             else:
                 return f"JSON形式エラー: オブジェクト形式ではありません"
                 
         except json.JSONDecodeError as e:
-            print(f"[Warning] JSON解析エラー: {e}")
-            print(f"生のレスポンス: {raw_response}")
+            logger.warning(f"[Warning] JSON解析エラー: {e}")
+            logger.info(f"生のレスポンス: {raw_response}")
             # JSONパースに失敗した場合は、従来通りの文字列として処理
             return raw_response
         except Exception as e:
@@ -620,7 +636,7 @@ class OllamaVisionExplainer:
             debug_message = f"[{timestamp}] 画面解析: {screen_analysis}"
             
             # コンソールに出力（Windowsの文字化け対策）
-            print(f"[DEBUG] {debug_message}")
+            logger.info(f"[DEBUG] {debug_message}")
             
             # ログファイルに保存
             if self.debug_log_file:
@@ -628,7 +644,7 @@ class OllamaVisionExplainer:
                     f.write(f"{debug_message}\n")
                     
         except Exception as e:
-            print(f"デバッグ出力処理エラー: {e}")
+            logger.error(f"デバッグ出力処理エラー: {e}")
     
 
     
@@ -639,7 +655,7 @@ class OllamaVisionExplainer:
         [非推奨] 旧来のXML書き込みメソッド
         新しいキューベースシステム（add_comments_to_queue）を使用してください
         """
-        print("[Warning] write_to_xml_log は非推奨です。add_comments_to_queue を使用してください")
+        logger.warning("[Warning] write_to_xml_log は非推奨です。add_comments_to_queue を使用してください")
         self.add_comments_to_queue(response_data)
     
     def update_last_request_time(self):
@@ -733,7 +749,7 @@ class OllamaVisionExplainer:
                         
                         # 非ゲーム内容の二重チェック
                         if self.is_non_game_comment(comment):
-                            print(f"[Filter] 非ゲーム内容として除外: {persona} - {comment}")
+                            logger.info(f"[Filter] 非ゲーム内容として除外: {persona} - {comment}")
                             filtered_count += 1
                             continue
                         
@@ -747,7 +763,7 @@ class OllamaVisionExplainer:
                 else:
                     # 未知の人格IDの場合のログ出力
                     if self.debug_mode:
-                        print(f"[Debug] 未知の人格ID: {persona} - スキップしました")
+                        logger.info(f"[Debug] 未知の人格ID: {persona} - スキップしました")
             
             # 有効なコメントがある場合のみランダムな順序でキューに追加
             if valid_comments:
@@ -756,10 +772,10 @@ class OllamaVisionExplainer:
                 
                 for comment_item in valid_comments:
                     self.comment_queue.put(comment_item)
-                    print(f"[Queue] キューに追加: {comment_item['persona']} - {comment_item['comment']}")
+                    logger.info(f"[Queue] キューに追加: {comment_item['persona']} - {comment_item['comment']}")
             else:
                 reason = f"非ゲーム画面（{filtered_count}件フィルタ）" if filtered_count > 0 else "有効なコメントなし"
-                print(f"[XML] ゲーム画面でないため、コメントをスキップしました ({reason})")
+                logger.info(f"[XML] ゲーム画面でないため、コメントをスキップしました ({reason})")
         else:
             # 従来の単一コメント
             if (response_data and response_data.strip() != "" and 
@@ -772,9 +788,9 @@ class OllamaVisionExplainer:
                     # timestampは削除 - XML出力時に生成する
                 }
                 self.comment_queue.put(comment_item)
-                print(f"[Queue] キューに追加: レガシー - {response_data}")
+                logger.info(f"[Queue] キューに追加: レガシー - {response_data}")
             else:
-                print("[XML] 非ゲーム内容またはnoneのため、コメントをスキップしました")
+                logger.info("[XML] 非ゲーム内容またはnoneのため、コメントをスキップしました")
     
     def start_xml_output_thread(self):
         """
@@ -785,7 +801,7 @@ class OllamaVisionExplainer:
             self.xml_output_thread = threading.Thread(target=self._xml_output_worker)
             self.xml_output_thread.daemon = True
             self.xml_output_thread.start()
-            print("[Thread] XML出力スレッドを開始しました")
+            logger.info("[Thread] XML出力スレッドを開始しました")
     
     def stop_xml_output_thread(self):
         """
@@ -793,17 +809,17 @@ class OllamaVisionExplainer:
         """
         self.xml_thread_running = False
         if self.xml_output_thread and self.xml_output_thread.is_alive():
-            print("[Stop] XML出力スレッドを停止中...")
+            logger.info("[Stop] XML出力スレッドを停止中...")
             # 終了シグナルをキューに送信
             self.comment_queue.put(None)
             self.xml_output_thread.join(timeout=5)
-            print("[OK] XML出力スレッドを停止しました")
+            logger.info("[OK] XML出力スレッドを停止しました")
     
     def _xml_output_worker(self):
         """
         XML出力用ワーカースレッド（別スレッドで動作）
         """
-        print("[Start] XML出力ワーカーを開始しました")
+        logger.info("[Start] XML出力ワーカーを開始しました")
         
         while self.xml_thread_running:
             try:
@@ -813,7 +829,7 @@ class OllamaVisionExplainer:
                 if queue_size == 0:
                     # キューが空の場合：1-2秒のランダム間隔
                     wait_time = random.uniform(1.0, 2.0)
-                    print(f"💤 キューが空です。{wait_time:.1f}秒待機...")
+                    logger.info(f"💤 キューが空です。{wait_time:.1f}秒待機...")
                 elif queue_size <= 5:
                     # 少しコメントがある場合：0.8-5秒
                     wait_time = random.uniform(0.8, 5.0)
@@ -846,10 +862,10 @@ class OllamaVisionExplainer:
                     continue
                     
             except Exception as e:
-                print(f"XML出力ワーカーエラー: {e}")
+                logger.error(f"XML出力ワーカーエラー: {e}")
                 time.sleep(1)  # エラー時は1秒待機
         
-        print("[Stop] XML出力ワーカーを終了しました")
+        logger.info("[Stop] XML出力ワーカーを終了しました")
     
     def _write_single_comment_to_xml(self, comment_item):
         """
@@ -876,30 +892,38 @@ class OllamaVisionExplainer:
             # コメント末尾の文字数カウント表示を除去
             comment_cleaned = self.remove_character_count(comment)
             
-            # XMLコメント要素を作成
-            comment_xml = f'  <comment no="0" time="{unix_time}" owner="0" service="youtubelive" handle="{handle}">{comment_cleaned}</comment>'
-            
-            # ファイルを読み込み
-            with open(self.xml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # </log>の直前に新しいコメントを挿入
-            content = content.replace('</log>', f'{comment_xml}\n</log>')
-            
-            # ファイルに書き戻し
-            with open(self.xml_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # ファイル全体は読み書きせず、末尾の</log>の位置に新しいコメントを上書き
+            with open(self.xml_file, 'r+b') as f:
+                file_size = f.seek(0, os.SEEK_END)
+                tail_start = max(0, file_size - XML_TAIL_READ_SIZE)
+                f.seek(tail_start)
+                tail = f.read()
+                tag_pos = tail.rfind(XML_CLOSING_TAG)
+                if tag_pos == -1:
+                    logger.error(f"XML書き込みエラー: 終了タグが見つかりません: {self.xml_file}")
+                    return
+                
+                # XMLコメント要素を1回の結合で組み立て、</log>以降の内容（末尾の改行など）はそのまま残す
+                line = b''.join((
+                    b'  <comment no="0" time="', str(unix_time).encode('ascii'),
+                    b'" owner="0" service="youtubelive" handle="', handle.encode('utf-8'),
+                    b'">', comment_cleaned.encode('utf-8'), b'</comment>', XML_LINE_END,
+                    tail[tag_pos:]
+                ))
+                f.seek(tail_start + tag_pos)
+                f.write(line)
+                f.truncate()
             
             # カウンターをインクリメント
             self.comment_counter += 1
             
             # 文字数カウント除去前後で異なる場合のみ情報を表示
             if comment != comment_cleaned:
-                print(f"[XML] 文字数カウント除去: '{comment}' → '{comment_cleaned}'")
-            print(f"[XML] XML出力: {persona} - {comment_cleaned}")
+                logger.info(f"[XML] 文字数カウント除去: '{comment}' → '{comment_cleaned}'")
+            logger.info(f"[XML] XML出力: {persona} - {comment_cleaned}")
             
         except Exception as e:
-            print(f"XML書き込みエラー: {e}")
+            logger.error(f"XML書き込みエラー: {e}")
     
     def run_continuous_analysis(self, interval=1):
         """
@@ -908,17 +932,17 @@ class OllamaVisionExplainer:
         Args:
             interval: 実行間隔（秒）
         """
-        print(f"Ollama Vision Explainer を開始しました")
-        print(f"画像解析モデル: {self.model_name}")
-        print(f"コメント生成モデル: {self.comment_model_name}")
-        print(f"実行間隔: {interval}秒")
-        print(f"Ollama URL: {self.ollama_url}")
-        print(f"音声認識: {'有効' if self.enable_voice else '無効'}")
-        print(f"デバッグモード: {'有効' if self.debug_mode else '無効'}")
+        logger.info(f"Ollama Vision Explainer を開始しました")
+        logger.info(f"画像解析モデル: {self.model_name}")
+        logger.info(f"コメント生成モデル: {self.comment_model_name}")
+        logger.info(f"実行間隔: {interval}秒")
+        logger.info(f"Ollama URL: {self.ollama_url}")
+        logger.info(f"音声認識: {'有効' if self.enable_voice else '無効'}")
+        logger.info(f"デバッグモード: {'有効' if self.debug_mode else '無効'}")
         if self.debug_mode and self.debug_log_file:
-            print(f"デバッグログ: {self.debug_log_file}")
-        print("-" * 50)
-        print("Ctrl+C で停止できます\n")
+            logger.info(f"デバッグログ: {self.debug_log_file}")
+        logger.info("-" * 50)
+        logger.info("Ctrl+C で停止できます\n")
         
         # 音声認識を開始
         if self.enable_voice:
@@ -930,14 +954,14 @@ class OllamaVisionExplainer:
         while True:
             try:
                 # 現在時刻を表示
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                print(f"[{current_time}] スクリーンショット解析を実行中...")
+                current_time = time.strftime("%Y-%m-%d %H:%M:%S")
+                logger.info(f"[{current_time}] スクリーンショット解析を実行中...")
                 
                 # スクリーンショットを取得
                 screenshot = self.get_active_window_screenshot()
                 
                 if screenshot is None:
-                    print("スクリーンショットが取得できませんでした")
+                    logger.info("スクリーンショットが取得できませんでした")
                     time.sleep(interval)
                     continue
                 
@@ -945,28 +969,28 @@ class OllamaVisionExplainer:
                 image_base64 = self.image_to_base64(screenshot)
                 
                 if image_base64 is None:
-                    print("画像のエンコードに失敗しました")
+                    logger.info("画像のエンコードに失敗しました")
                     time.sleep(interval)
                     continue
                 
                 # 【第1段階】画像の詳細解析
-                print("  [段階1] 画像の詳細解析を実行中...")
+                logger.info("  [段階1] 画像の詳細解析を実行中...")
                 image_analysis = self.send_image_analysis_to_ollama(image_base64)
                 
                 if image_analysis.startswith("エラー:"):
-                    print(f"画像解析エラー: {image_analysis}")
+                    logger.error(f"画像解析エラー: {image_analysis}")
                     time.sleep(interval)
                     continue
                 
-                print(f"  [段階1] 完了: 画像解析結果を取得しました")
+                logger.info(f"  [段階1] 完了: 画像解析結果を取得しました")
                 
                 # 【第2段階】音声コンテキストを取得してコメント生成
-                print("  [段階2] コメント生成を実行中...")
+                logger.info("  [段階2] コメント生成を実行中...")
                 voice_context = self.get_voice_context()
                 response = self.send_comment_generation_to_ollama(image_analysis, voice_context)
                 
                 # 結果を表示
-                print(f"[Screenshot] 最終結果:")
+                logger.info(f"[Screenshot] 最終結果:")
                 if isinstance(response, dict):
                     # JSON形式の複数人格レスポンス
                     for persona, comment_data in response.items():
@@ -998,26 +1022,26 @@ class OllamaVisionExplainer:
                             comment = comment_data
                         
                         persona_name = persona_names.get(persona, persona)
-                        print(f"  {persona_name}: {comment}")
+                        logger.info(f"  {persona_name}: {comment}")
                     
                     # コメントをキューに追加（XML出力は別スレッドで順次実行）
                     self.add_comments_to_queue(response)
                 else:
                     # エラーメッセージや従来の文字列レスポンス
-                    print(f"{response}")
+                    logger.info(f"{response}")
                     if not response.startswith("エラー:"):
                         self.add_comments_to_queue(response)
                 
-                print("-" * 50)
+                logger.info("-" * 50)
                 
                 # 指定された間隔で待機
                 time.sleep(interval)
                 
             except KeyboardInterrupt:
-                print("\n\nアプリケーションを終了します...")
+                logger.info("\n\nアプリケーションを終了します...")
                 break
             except Exception as e:
-                print(f"予期しないエラー: {e}")
+                logger.error(f"予期しないエラー: {e}")
                 time.sleep(interval)
         
         # 終了処理: 音声認識とXML出力スレッドを停止
@@ -1026,11 +1050,37 @@ class OllamaVisionExplainer:
         self.stop_xml_output_thread()
 
 
+def setup_logging():
+    """
+    ロガーをキュー経由の非同期出力に設定
+    
+    各スレッドはレコードをキューに積むだけで、標準出力への書き込みは
+    QueueListenerのスレッドでまとめて行う（設定は最初の呼び出しの1回だけ行い、
+    終了時にキューに残った分を出力してからリスナーを止める）
+    
+    Returns:
+        logging.handlers.QueueListener: 開始済みのリスナー
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
+    
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    atexit.register(listener.stop)
+    _log_listener = listener
+    return listener
+
+
 def main():
     """
     メイン関数
     """
-    import sys
     import argparse
     
     try:
@@ -1095,13 +1145,13 @@ def main():
         )
         
         if config.behavior.debug_mode:
-            print("[Debug] デバッグモードが有効です。画面解析の詳細情報が表示されます。")
+            logger.info("[Debug] デバッグモードが有効です。画面解析の詳細情報が表示されます。")
         
         # 継続的な解析を開始
         explainer.run_continuous_analysis(interval=config.behavior.analysis_interval)
         
     except Exception as e:
-        print(f"アプリケーション起動エラー: {e}")
+        logger.error(f"アプリケーション起動エラー: {e}")
 
 
 if __name__ == "__main__":
@@ -5,11 +5,25 @@ personas.yamlファイルから人格定義を読み込み、ランダム選択
 """
 
 import os
+import re
 import yaml
 import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+# libyamlが利用可能ならCローダーを使用（未ビルド環境では純Python版にフォールバック）
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# プロンプトテンプレート内のプレースホルダー（1回の走査でまとめて置換する）
+_PLACEHOLDER_PATTERN = re.compile(r"\{(PERSONA_DESCRIPTIONS|VOICE_CONTEXT|JSON_FIELDS)\}")
+
+# 人格説明・JSONフィールドの書式（人格ごとに1回だけformatする）
+_PERSONA_DESCRIPTION_FORMAT = "{i}. **{name}**: {description}\n   スタイル: {style}\n   例: {example}"
+_JSON_FIELD_FORMAT = '  "{persona_id}": "画面の具体的要素1つに言及した短いコメント（20文字以内、ゲーム画面でない場合は「none」）"'
+
 
 @dataclass
 class Persona:
@@ -38,6 +52,8 @@ class PersonaManager:
         self.personas_file = personas_file or self.DEFAULT_PERSONAS_FILE
         self.suppress_warnings = suppress_warnings
         self.personas: Dict[str, Persona] = {}
+        # プロンプトテンプレートのキャッシュ（パス -> (更新時刻, 内容)）
+        self._prompt_cache: Dict[str, Tuple[float, str]] = {}
         self._load_personas()
     
     def _load_personas(self):
@@ -45,7 +61,7 @@ class PersonaManager:
         try:
             if os.path.exists(self.personas_file):
                 with open(self.personas_file, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=_YamlLoader)
                 
                 personas_data = data.get('personas', {})
                 for persona_id, persona_info in personas_data.items():
@@ -127,10 +143,16 @@ class PersonaManager:
         Returns:
             生成されたプロンプト
         """
-        # プロンプトテンプレートを読み込み
+        # プロンプトテンプレートを読み込み（更新時刻が変わらない限りキャッシュを使用）
         try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                prompt_template = f.read()
+            st = os.stat(prompt_file)
+            cached = self._prompt_cache.get(prompt_file)
+            if cached and cached[0] == st.st_mtime:
+                prompt_template = cached[1]
+            else:
+                with open(prompt_file, 'r', encoding='utf-8') as f:
+                    prompt_template = f.read()
+                self._prompt_cache[prompt_file] = (st.st_mtime, prompt_template)
         except FileNotFoundError:
             print(f"⚠️  プロンプトファイルが見つかりません: {prompt_file}")
             # フォールバック用の最小限のプロンプト
@@ -155,20 +177,22 @@ class PersonaManager:
         json_fields = []
         
         for i, persona in enumerate(selected_personas, 1):
-            persona_descriptions.append(
-                f"{i}. **{persona.name}**: {persona.description}\n   スタイル: {persona.style}\n   例: {persona.example}"
-            )
-            json_fields.append(f'  "{persona.persona_id}": "画面の具体的要素1つに言及した短いコメント（20文字以内、ゲーム画面でない場合は「none」）"')
+            persona_descriptions.append(_PERSONA_DESCRIPTION_FORMAT.format(
+                i=i, name=persona.name, description=persona.description,
+                style=persona.style, example=persona.example
+            ))
+            json_fields.append(_JSON_FIELD_FORMAT.format(persona_id=persona.persona_id))
         
         # 音声セクションを生成
         voice_section = f"\n\n**音声認識結果:**\n{voice_context}" if voice_context else ""
         
         # プレースホルダーを置換
-        prompt = prompt_template.replace("{PERSONA_DESCRIPTIONS}", chr(10).join(persona_descriptions))
-        prompt = prompt.replace("{VOICE_CONTEXT}", voice_section)
-        prompt = prompt.replace("{JSON_FIELDS}", chr(10).join(json_fields))
-        
-        return prompt
+        replacements = {
+            "PERSONA_DESCRIPTIONS": "\n".join(persona_descriptions),
+            "VOICE_CONTEXT": voice_section,
+            "JSON_FIELDS": "\n".join(json_fields),
+        }
+        return _PLACEHOLDER_PATTERN.sub(lambda m: replacements[m.group(1)], prompt_template)
     
     def get_persona_mapping(self, selected_personas: List[Persona]) -> Dict[str, Dict[str, str]]:
         """
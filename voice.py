@@ -5,10 +5,17 @@ Whisperを使用してマイクからの音声をリアルタイムで文字起
 """
 
 import argparse
+import collections
+import hashlib
+import importlib.util
+import os
 import queue
+import shutil
+import stat
 import sys
 import threading
 import time
+from multiprocessing.managers import BaseManager
 from typing import Optional
 
 import numpy as np
@@ -16,23 +23,278 @@ import pyaudio
 import whisper
 import torch
 import requests
-from flask import Flask, jsonify, request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, Response, jsonify, request
 import json
 
+# orjsonがあればWebAPIのJSONのエンコード・デコードに使用する（なければ標準のjson）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numbaがあれば無音判定の前処理カーネルをJITコンパイルする（なければNumPy実装を使用）
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# プリエンファシス係数
+PRE_EMPHASIS = 0.97
+
+
+def _preemphasis_energy(x, out, prev):
+    """
+    プリエンファシス（DC・低域除去）と二乗和を1パスで計算
+    
+    Args:
+        x: 入力音声 (float32)
+        out: プリエンファシス後の音声の書き込み先 (xと同じ長さ)
+        prev: 直前のチャンクの最終サンプル
+    
+    Returns:
+        tuple: (二乗和, このチャンクの最終サンプル)
+    """
+    acc = 0.0
+    for i in range(x.shape[0]):
+        v = x[i] - PRE_EMPHASIS * prev
+        out[i] = v
+        acc += v * v
+        prev = x[i]
+    return acc, prev
+
+
+def _preemphasis_energy_numpy(x, out, prev):
+    """_preemphasis_energy のNumPy版（numba未インストール時に使用）"""
+    out[0] = x[0] - PRE_EMPHASIS * prev
+    np.multiply(x[:-1], -PRE_EMPHASIS, out=out[1:])
+    out[1:] += x[1:]
+    return float(np.dot(out, out)), float(x[-1])
+
+
+if njit is not None:
+    _preemphasis_energy = njit(cache=True, fastmath=True)(_preemphasis_energy)
+else:
+    _preemphasis_energy = _preemphasis_energy_numpy
+
+
+class _CudaGraphEncoder(torch.nn.Module):
+    """
+    WhisperエンコーダーをCUDAグラフで実行するラッパー
+    
+    エンコーダーへの入力メルは常に (1, n_mels, 3000) の固定形状なので、
+    forwardを一度CUDAグラフとしてキャプチャし、以降は静的入力バッファへコピーしてreplayする。
+    形状・型が異なる入力は元のエンコーダーでそのまま実行する。
+    """
+    
+    # キャプチャ前のウォームアップ回数
+    WARMUP_STEPS = 3
+    
+    def __init__(self, encoder: torch.nn.Module, dims, dtype: torch.dtype = torch.float16):
+        super().__init__()
+        self.encoder = encoder
+        
+        # 静的入出力バッファ（グラフはこのメモリ上で再生される）
+        self._mel_in = torch.zeros(1, dims.n_mels, whisper.audio.N_FRAMES, device="cuda", dtype=dtype)
+        
+        with torch.no_grad():
+            # ウォームアップ（cuDNNのアルゴリズム選択等をキャプチャ前に済ませる）
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream):
+                for _ in range(self.WARMUP_STEPS):
+                    self.encoder(self._mel_in)
+            torch.cuda.current_stream().wait_stream(stream)
+            
+            self._graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self._graph):
+                self._enc_out = self.encoder(self._mel_in)
+    
+    def forward(self, mel: torch.Tensor) -> torch.Tensor:
+        if mel.shape != self._mel_in.shape or mel.dtype != self._mel_in.dtype or mel.device != self._mel_in.device:
+            return self.encoder(mel)
+        
+        # 出力バッファは次のreplayで上書きされる（デコード中は次のエンコードが走らないので問題ない）
+        self._mel_in.copy_(mel)
+        self._graph.replay()
+        return self._enc_out
+
+
+class _WhisperTRTModel:
+    """
+    TensorRT-LLM Whisperエンジンのアダプター
+    
+    whisperのモデルと同じく transcribe(audio, language="ja") -> {"text": str} で呼び出せるようにし、
+    認識側はバックエンドの違いを意識せずに済むようにする。
+    メル計算は呼び出し元のGPUバッファを使い回すため、関数として受け取る。
+    """
+    
+    # 128次元メルを使うモデル名（openai-whisperでは "large" もlarge-v3を指す）
+    MEL128_MODELS = ("large", "large-v3", "large-v3-turbo", "turbo")
+    
+    def __init__(self, runner, model_name: str, log_mel, max_new_tokens: int, engine_dir: Optional[str] = None):
+        self.runner = runner
+        self.log_mel = log_mel
+        self.max_new_tokens = max_new_tokens
+        
+        # メル次元はエンジンのビルド時の設定を優先し、読めなければモデル名から判断する
+        self.n_mels = self._read_n_mels(engine_dir)
+        if self.n_mels is None:
+            self.n_mels = 128 if model_name in self.MEL128_MODELS else 80
+        self.multilingual = not model_name.endswith(".en")
+        
+        # 128次元メルのモデル（large-v3系）は言語トークンが1つ多い
+        self.num_languages = 100 if self.n_mels == 128 else 99
+        self._prompts = {}
+    
+    @staticmethod
+    def _read_n_mels(engine_dir: Optional[str]) -> Optional[int]:
+        """TensorRT-LLMのビルドが出力したエンコーダーの設定 (encoder/config.json) からメル次元を取得"""
+        if not engine_dir:
+            return None
+        try:
+            with open(os.path.join(engine_dir, "encoder", "config.json"), "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # バージョンによって pretrained_config / builder_config のどちらかに入っている
+        for section in (config.get("pretrained_config"), config.get("builder_config"), config):
+            if isinstance(section, dict) and "n_mels" in section:
+                return int(section["n_mels"])
+        return None
+    
+    def _prompt(self, language: str):
+        """言語ごとの文字起こし・タイムスタンプなしのプロンプトを作成（作成済みなら再利用）"""
+        if language not in self._prompts:
+            tokenizer = whisper.tokenizer.get_tokenizer(
+                multilingual=self.multilingual, num_languages=self.num_languages,
+                language=language, task="transcribe"
+            )
+            prompt_ids = list(tokenizer.sot_sequence_including_notimestamps)
+            self._prompts[language] = (tokenizer, torch.tensor([prompt_ids], dtype=torch.int32))
+        return self._prompts[language]
+    
+    def transcribe(self, audio: np.ndarray, language: str = "ja") -> dict:
+        """音声認識（メル計算→エンコーダー→貪欲デコード）"""
+        tokenizer, prompt = self._prompt(language)
+        
+        # 30秒固定長のメルをGPU上で計算（エンジンは固定形状に特化してビルド済み）
+        mel = self.log_mel(audio, self.n_mels)
+        mel = mel.to(torch.float16).unsqueeze(0)
+        mel_lengths = torch.tensor([mel.shape[2]], dtype=torch.int32, device=mel.device)
+        
+        with torch.no_grad():
+            outputs = self.runner.generate(
+                batch_input_ids=prompt,
+                encoder_input_features=mel.transpose(1, 2),
+                encoder_output_lengths=mel_lengths // 2,
+                max_new_tokens=self.max_new_tokens,
+                end_id=tokenizer.eot,
+                pad_id=tokenizer.eot,
+                num_beams=1,
+                return_dict=True
+            )
+        
+        # 特殊トークン（プロンプト・終端など）を除いてデコード
+        output_ids = outputs['output_ids'][0][0].tolist()
+        return {"text": tokenizer.decode([t for t in output_ids if t < tokenizer.eot]).strip()}
+
+
+def _json_response(obj, status: int = 200):
+    """JSONレスポンスを作成（orjsonがあればbytesへ直接エンコード）"""
+    if orjson is None:
+        return jsonify(obj), status
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+def _json_loads(content: bytes):
+    """JSONレスポンスの本文をデコード"""
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
 
 class RealTimeVoiceRecognizer:
     """リアルタイム音声認識クラス"""
     
-    def __init__(self, model_name: str = "medium", device: Optional[str] = None):
+    # 利用可能な推論バックエンド
+    BACKENDS = ("whisper", "faster-whisper", "trt", "onnx", "openvino")
+    
+    # TensorRT-LLMで1チャンクあたりに生成する最大トークン数
+    TRT_MAX_NEW_TOKENS = 96
+    
+    # ONNX Runtimeで1回の認識あたりに生成する最大トークン数
+    ONNX_MAX_NEW_TOKENS = 224
+    
+    # OpenVINOの推論デバイスと、コンパイル済みモデルのキャッシュ先
+    OPENVINO_DEVICES = ("CPU", "GPU", "NPU")
+    OPENVINO_CACHE_DIR = os.path.expanduser("~/.cache/whisper_ov")
+    
+    # 読み込み済みWhisperモデルの重みのキャッシュ先（共有メモリ上のユーザーごとのディレクトリ、存在しない環境ではキャッシュしない）
+    MODEL_CACHE_DIR = "/dev/shm"
+    
+    # 無音判定の閾値（プリエンファシス後のRMS、環境ノイズに合わせて変化する閾値の下限）
+    # プリエンファシスで有声音の主成分（数百Hz以下）は振幅が1/5程度になるため、元の波形の0.001相当
+    SILENCE_THRESHOLD = 0.0002
+    
+    # 環境ノイズの推定値に対する無音判定の倍率
+    # （プリエンファシスは白色雑音より有声音を大きく減衰させるため、倍率は小さめにする）
+    NOISE_FLOOR_RATIO = 2.0
+    
+    # 環境ノイズの推定に使うフレーム長（ミリ秒）とパーセンタイル（チャンク内の静かなフレームのRMSをノイズとみなす）
+    NOISE_FRAME_MS = 20
+    NOISE_FRAME_PERCENTILE = 10
+    
+    # 環境ノイズの推定に使う直近のチャンク数（この間の推定値の最小値を使う）と、推定値の上限
+    # （発話が続いても推定値が発話の音量まで上がり、通常の発話が無音扱いにならないようにする）
+    NOISE_FLOOR_WINDOW = 5
+    NOISE_FLOOR_MAX = 0.005
+    
+    # VADで発話ありと判定する最小の発話長（ミリ秒）と、webrtcvadのフレーム長・判定の厳しさ (0-3)
+    VAD_MIN_SPEECH_MS = 200
+    WEBRTC_VAD_FRAME_MS = 30
+    WEBRTC_VAD_MODE = 3
+    
+    # 録音コールバック1回あたりのサンプル数
+    CALLBACK_FRAMES = 1024
+    
+    # 認識が追いつかない間に保持する未処理音声の最大チャンク数（3秒×3=9秒）
+    # キュー・rtmixerのリングバッファのどちらも超えた分は古い方から破棄して遅延を抑え、
+    # 溜まった分は1回の認識でまとめて処理する（バッチの最大チャンク数・処理用バッファの大きさもこの値から決まる）
+    MAX_BACKLOG_CHUNKS = 3
+    
+    # 音声認識結果の時刻配列の初期容量（不足したら倍に拡張）
+    TEXT_BUFFER_INITIAL_SIZE = 1024
+    
+    # 保持する音声認識結果の最大件数（超えたら古いものから1割ずつ破棄）
+    TEXT_BUFFER_MAX_SIZE = 10000
+    
+    # 利用可能な音声キャプチャ方式
+    CAPTURE_METHODS = ("pyaudio", "rtmixer", "sounddevice")
+    
+    # rtmixerのリングバッファ容量（サンプル数、2の冪である必要がある。16kHzで約32秒）
+    RTMIXER_RINGBUFFER_SIZE = 2 ** 19
+    
+    def __init__(self, model_name: str = "medium", device: Optional[str] = None, backend: Optional[str] = None, trt_engine_dir: Optional[str] = None, capture: str = "pyaudio", onnx_model_dir: Optional[str] = None, openvino_model_dir: Optional[str] = None, openvino_device: Optional[str] = None, vad: bool = False, model_server_port: Optional[int] = None):
         """
         初期化
         
         Args:
             model_name: Whisperモデル名 (tiny, base, small, medium, large)
             device: 使用するデバイス ("cpu" or "cuda")
+            backend: 推論バックエンド ("whisper": openai-whisper, "faster-whisper": CTranslate2, "trt": TensorRT-LLM, "onnx": ONNX Runtime, "openvino": OpenVINO GenAI)
+                     未指定の場合はCPU使用時にOpenVINOモデルが指定されていればopenvino、
+                     それ以外はfaster-whisperがインストールされていればfaster-whisper、なければwhisper
+            trt_engine_dir: ビルド済みTensorRT-LLMエンジンのディレクトリ (backend="trt" の場合に必須)
+            capture: 音声キャプチャ方式 ("pyaudio": Pythonコールバック, "rtmixer": Cコールバック+リングバッファ, "sounddevice": NumPy配列を受け取るPythonコールバック)
+            onnx_model_dir: エクスポート済みONNXモデルのディレクトリ (backend="onnx" の場合に必須)
+            openvino_model_dir: エクスポート済みOpenVINOモデルのディレクトリ (backend="openvino" の場合に必須)
+            openvino_device: OpenVINOの推論デバイス ("CPU", "GPU", "NPU")。未指定の場合はCPU使用時はCPU、それ以外はGPU
+            vad: Silero VADで発話を含まないチャンクを認識前に除外するか
+            model_server_port: 指定した場合はモデルを読み込まず、起動済みの共有モデルサーバー (--serve) で推論
         """
-        print(f"Whisperモデル '{model_name}' を読み込み中...")
-        
         # デバイスの自動選択
         if device is None:
             cuda_available = torch.cuda.is_available()
@@ -42,9 +304,82 @@ class RealTimeVoiceRecognizer:
                 print(f"GPU: {torch.cuda.get_device_name(0)}")
                 print(f"GPUメモリ: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f}GB")
         
+        if backend is None:
+            backend = self.default_backend(device, openvino_model_dir)
+        if openvino_device is None:
+            openvino_device = "CPU" if device == "cpu" else "GPU"
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未対応のバックエンドです: {backend}")
+        if capture not in self.CAPTURE_METHODS:
+            raise ValueError(f"未対応のキャプチャ方式です: {capture}")
+        if backend == "trt" and not trt_engine_dir:
+            raise ValueError("TensorRT-LLMバックエンドにはエンジンディレクトリの指定が必要です")
+        if backend == "onnx" and not onnx_model_dir:
+            raise ValueError("ONNX Runtimeバックエンドにはモデルディレクトリの指定が必要です")
+        if backend == "openvino" and not openvino_model_dir:
+            raise ValueError("OpenVINOバックエンドにはモデルディレクトリの指定が必要です")
+        if openvino_device not in self.OPENVINO_DEVICES:
+            raise ValueError(f"未対応のOpenVINOデバイスです: {openvino_device}")
+        
+        print(f"Whisperモデル '{model_name}' を読み込み中...")
+        
         self.device = device
-        self.model = whisper.load_model(model_name, device=device)
-        print(f"モデル読み込み完了 (デバイス: {device})")
+        self.backend = backend
+        self.model_server_port = model_server_port
+        if model_server_port is not None:
+            # 共有モデルサーバーに接続（VRAM上のモデルは1つのまま、複数プロセスから利用する）
+            self.model = SharedModelServer.connect(model_server_port)
+        elif backend == "faster-whisper":
+            self.model = self._load_faster_whisper(model_name, device)
+        elif backend == "trt":
+            if device != "cuda":
+                raise ValueError("TensorRT-LLMバックエンドはCUDAデバイスでのみ使用できます")
+            self._init_gpu_audio_buffers(device)
+            self.model = self._load_trt_engine(model_name, trt_engine_dir)
+        elif backend == "onnx":
+            self.model = self._load_onnx_model(onnx_model_dir, device)
+        elif backend == "openvino":
+            self.model = self._load_openvino_pipeline(openvino_model_dir, openvino_device)
+        else:
+            self.model = self._load_whisper_model(model_name, device)
+            
+            # CUDA使用時はエンコーダーをCUDAグラフ化してカーネル起動のオーバーヘッドを削減
+            # （デコーダーはKVキャッシュをDecodingTaskが呼び出しごとに付け外しするフックで保持するため、
+            #   torch.compileするとチャンクごとに再コンパイルが走るのでeagerのまま実行する）
+            if device == "cuda":
+                self._convert_to_fp16()
+                self._capture_encoder_graph()
+                
+                # GPU上でメル計算・デコードを直接行うためのトークナイザーと設定
+                self._tokenizer = whisper.tokenizer.get_tokenizer(
+                    self.model.is_multilingual, num_languages=self.model.num_languages,
+                    language="ja", task="transcribe"
+                )
+                # DecodingTask（トークナイザー・プロンプト・ロジットフィルター）は一度だけ作成して使い回す
+                # （run()ごとにデコーダー状態をリセットし、KVキャッシュのフックも解除される）
+                self._decoding_task = whisper.decoding.DecodingTask(
+                    self.model, whisper.DecodingOptions(language="ja", task="transcribe", fp16=True)
+                )
+                self._decoding_task_no_ts = whisper.decoding.DecodingTask(
+                    self.model, whisper.DecodingOptions(language="ja", task="transcribe", fp16=True, without_timestamps=True)
+                )
+                self._init_gpu_audio_buffers(device)
+                self._warmup()
+            else:
+                # transcribe()に毎回渡す設定（貪欲デコード1回のみ。温度フォールバック・ビームサーチによる
+                # 再デコードを行わず、再デコード判定用の圧縮率計算も省いて遅延の上限を抑える）
+                # 無音区間（ハルシネーション）の除外にはno_speech_threshold・logprob_thresholdの既定値を使う
+                self._transcribe_options = dict(
+                    language="ja",
+                    task="transcribe",
+                    temperature=0.0,
+                    beam_size=None,
+                    best_of=None,
+                    condition_on_previous_text=False,
+                    compression_ratio_threshold=None,
+                    fp16=False
+                )
+        print(f"モデル読み込み完了 (デバイス: {device}, バックエンド: {backend})")
         
         # 音声設定
         self.sample_rate = 16000
@@ -52,23 +387,343 @@ class RealTimeVoiceRecognizer:
         self.chunk_size = int(self.sample_rate * self.chunk_duration)
         self.format = pyaudio.paFloat32
         self.channels = 1
+        self.capture = capture
         
-        # PyAudio初期化
+        # PyAudio初期化（rtmixer使用時もデバイス情報の取得に使用）
         self.audio = pyaudio.PyAudio()
         
-        # 音声データキュー
-        self.audio_queue = queue.Queue()
+        # 音声データキュー（コールバック1つ→処理スレッド1つのSPSC構成）
+        # dequeのappend/popleftはGIL下でアトミックなのでロック不要。満杯時は古いデータから破棄される
+        # （長さは未処理音声の上限 MAX_BACKLOG_CHUNKS 分をコールバック単位に換算したもの）
+        queue_maxlen = (self.MAX_BACKLOG_CHUNKS * self.chunk_size + self.CALLBACK_FRAMES - 1) // self.CALLBACK_FRAMES
+        self.audio_queue = collections.deque(maxlen=queue_maxlen)
+        
+        # 認識が追いつかずに破棄した音声のサンプル数（処理スレッドで警告表示後にリセット）
+        self._dropped_samples = 0
+        
+        # rtmixerのリングバッファ（録音開始時に作成）
+        self._ringbuffer = None
+        
+        # 処理スレッド用の音声バッファ（最大バッチ+1チャンク分を事前確保し、書き込み位置で管理）
+        self._ring = np.empty(self.chunk_size * (self.MAX_BACKLOG_CHUNKS + 1), dtype=np.float32)
+        self._ring_w = 0
+        
+        # 無音判定用の作業バッファとプリエンファシスの状態
+        self._scratch = np.empty(self.chunk_size, dtype=np.float32)
+        self._preemphasis_prev = 0.0
+        
+        # 直近のチャンクごとの環境ノイズの推定値
+        self._recent_noise = collections.deque(maxlen=self.NOISE_FLOOR_WINDOW)
+        
+        # 発話検出（faster-whisperは認識時に内蔵のVADを使うので読み込まない。
+        #   共有モデルサーバー接続時はサーバー側のバックエンドが分からないので、指定があれば読み込む）
+        self._vad_model = None
+        self._webrtc_vad = None
+        if vad and (model_server_port is not None or backend != "faster-whisper"):
+            self._load_vad()
+        
+        # JITコンパイルを済ませておき、最初のチャンクでコンパイル待ちが発生しないようにする
+        if njit is not None:
+            _preemphasis_energy(np.zeros(16, dtype=np.float32), self._scratch[:16], 0.0)
         
         # 制御フラグ
         self.is_recording = False
         self.is_processing = False
         
-        # 音声認識結果を蓄積するリスト
-        self.recognized_texts = []
+        # 処理スレッド（バッファ・GPU上の作業領域はインスタンスで共有するため、同時に1つだけ動かす）
+        self._processing_thread = None
+        
+        # 音声データ到着の通知（処理スレッドはポーリングせずに待機する）と、ローカルモードの終了通知
+        self._audio_ready = threading.Event()
+        self._stop_event = threading.Event()
+        
+        # 音声認識結果を蓄積するバッファ（時刻はNumPy配列、テキスト・表示用時刻は並行リストで保持）
+        # 時刻は昇順に追加されるので、時刻での絞り込みは二分探索で行える
+        self._times = np.empty(self.TEXT_BUFFER_INITIAL_SIZE, dtype=np.float64)
+        self._texts = []
+        self._timestrs = []
+        self._n = 0
         self.text_lock = threading.Lock()
         
         print(f"音声設定: {self.sample_rate}Hz, {self.chunk_duration}秒チャンク")
     
+    @staticmethod
+    def default_backend(device: str = "cpu", openvino_model_dir: Optional[str] = None) -> str:
+        """
+        デフォルトの推論バックエンド（高速なfaster-whisperを優先）
+        
+        CPU使用時は、変換済みモデルがあればOpenVINO（oneDNNでコンパイルされたグラフ）を優先する
+        """
+        if device == "cpu" and openvino_model_dir and importlib.util.find_spec("openvino_genai") is not None:
+            return "openvino"
+        if importlib.util.find_spec("faster_whisper") is not None:
+            return "faster-whisper"
+        return "whisper"
+    
+    def _model_cache_dir(self) -> Optional[str]:
+        """
+        モデルキャッシュのユーザー専用ディレクトリ（使えない場合はNone）
+        
+        /dev/shmは誰でも書き込めるため、他のユーザーが先に置いた重みを読み込まないよう、
+        本人のみアクセスできるディレクトリを作成し、所有者と権限を確認してから使う
+        """
+        if not os.path.isdir(self.MODEL_CACHE_DIR) or not hasattr(os, "getuid"):
+            return None
+        
+        uid = os.getuid()
+        path = os.path.join(self.MODEL_CACHE_DIR, f"whisper_cache_{uid}")
+        try:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            st = os.lstat(path)
+        except OSError as e:
+            print(f"モデルキャッシュのディレクトリを作成できませんでした: {e}")
+            return None
+        
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+            print(f"[警告] モデルキャッシュのディレクトリの所有者または権限が不正なため、キャッシュを使用しません ({path})")
+            return None
+        return path
+    
+    def _load_whisper_model(self, model_name: str, device: str):
+        """
+        Whisperモデルを読み込み（共有メモリ上に重みをキャッシュし、2回目以降の起動を高速化）
+        
+        キャッシュはmmapで読み込むため、ページキャッシュに残っている分はディスクから読み直さない
+        重みは元のチェックポイントと同じfp16で保存し、デバイスによらず同じキャッシュを使う
+        """
+        cache_dir = self._model_cache_dir()
+        if cache_dir is None:
+            return whisper.load_model(model_name, device=device)
+        
+        key = hashlib.sha1(f"{model_name}:fp16".encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"whisper_{key}.pt")
+        
+        if os.path.exists(cache_path):
+            try:
+                checkpoint = torch.load(cache_path, map_location="cpu", mmap=True, weights_only=True)
+                model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+                model.load_state_dict(checkpoint["model_state_dict"])
+                print(f"キャッシュからモデルを読み込みました ({cache_path})")
+                return model.to(device)
+            except Exception as e:
+                print(f"モデルキャッシュの読み込みに失敗しました: {e}")
+        
+        model = whisper.load_model(model_name, device=device)
+        
+        # 書き込み途中のファイルを読まないよう、一時ファイルに保存してから置き換える
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            # load_model()はfp32に変換して読み込むため、元のfp16に戻して保存する（共有メモリの使用量を半分に抑える）
+            state_dict = {
+                name: tensor.half() if tensor.is_floating_point() else tensor
+                for name, tensor in model.state_dict().items()
+            }
+            size = sum(tensor.numel() * tensor.element_size() for tensor in state_dict.values())
+            if shutil.disk_usage(cache_dir).free < size:
+                print(f"共有メモリの空き容量が不足しているため、モデルをキャッシュしません ({cache_dir})")
+                return model
+            
+            torch.save({"dims": vars(model.dims), "model_state_dict": state_dict}, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"モデルキャッシュの保存に失敗しました: {e}")
+            # 書き込み途中の一時ファイルを残すと共有メモリを占有し続けるため削除する
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        
+        return model
+    
+    def _load_faster_whisper(self, model_name: str, device: str):
+        """faster-whisper (CTranslate2) のモデルを読み込み"""
+        from faster_whisper import WhisperModel
+        
+        if device == "cuda":
+            # Tensor Core (Compute Capability 7.0以上) があればINT8+FP16、なければINT8
+            # INT8演算 (dp4a) はCompute Capability 6.1以上、それより古いGPUはFP32
+            capability = torch.cuda.get_device_capability()
+            if capability[0] >= 7:
+                compute_type = "int8_float16"
+            elif capability >= (6, 1):
+                compute_type = "int8"
+            else:
+                compute_type = "float32"
+        else:
+            compute_type = "int8"
+        
+        print(f"faster-whisper 演算精度: {compute_type}")
+        return WhisperModel(model_name, device=device, compute_type=compute_type)
+    
+    def _load_trt_engine(self, model_name: str, engine_dir: str):
+        """ビルド済みのTensorRT-LLM Whisperエンジン（エンコーダー・デコーダー）を読み込み"""
+        from tensorrt_llm.runtime import ModelRunnerCpp
+        
+        print(f"TensorRT-LLMエンジンを読み込み中... ({engine_dir})")
+        runner = ModelRunnerCpp.from_dir(
+            engine_dir=engine_dir,
+            is_enc_dec=True,
+            max_batch_size=1,
+            max_input_len=3000,
+            max_output_len=self.TRT_MAX_NEW_TOKENS,
+            max_beam_width=1
+        )
+        model = _WhisperTRTModel(runner, model_name, self._log_mel_gpu, self.TRT_MAX_NEW_TOKENS, engine_dir)
+        
+        # 日本語のプロンプトを事前に作成
+        model._prompt("ja")
+        return model
+    
+    def _load_onnx_model(self, model_dir: str, device: str):
+        """エクスポート済みのWhisper ONNXモデル（エンコーダー・デコーダー）をONNX Runtimeで読み込み"""
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor
+        
+        self._onnx_processor = WhisperProcessor.from_pretrained(model_dir)
+        
+        # CUDA使用時はIOバインディングで入出力・KVキャッシュをGPU上に保持し、
+        # エンコーダー・デコーダー呼び出しごとのホスト⇔デバイス転送を省く
+        provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+        print(f"ONNXモデルを読み込み中... ({model_dir}, {provider})")
+        return ORTModelForSpeechSeq2Seq.from_pretrained(
+            model_dir,
+            provider=provider,
+            use_io_binding=device == "cuda"
+        )
+    
+    def _load_openvino_pipeline(self, model_dir: str, device: str):
+        """エクスポート済みのWhisper OpenVINOモデルをOpenVINO GenAIで読み込み"""
+        import openvino_genai
+        
+        # GPU/NPUは読み込み時のコンパイルに数秒かかるため、コンパイル結果をディスクにキャッシュする
+        # （2回目以降の起動はキャッシュの読み込みのみになる。レイテンシ優先のためOPTIMIZE_SIZEは使わない）
+        os.makedirs(self.OPENVINO_CACHE_DIR, exist_ok=True)
+        print(f"OpenVINOモデルを読み込み中... ({model_dir}, {device})")
+        return openvino_genai.WhisperPipeline(model_dir, device, CACHE_DIR=self.OPENVINO_CACHE_DIR)
+    
+    def _load_vad(self):
+        """
+        Silero VADモデルを読み込み（CPUで実行、30msフレームあたり1ms未満）
+        
+        読み込めない場合（オフライン等）はwebrtcvadがあればそちらを使用し、どちらもなければVADを無効にする
+        """
+        print("Silero VADを読み込み中...")
+        try:
+            self._vad_model, utils = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+            self._get_speech_timestamps = utils[0]
+            return
+        except Exception as e:
+            print(f"Silero VADを読み込めませんでした: {e}")
+        
+        try:
+            import webrtcvad
+        except ImportError:
+            # どちらも使えない場合は、認識を止めずにVADなしで続行する
+            print("[警告] webrtcvadがインストールされていないため、VADを無効にします "
+                  "(Silero VADをオンラインで一度読み込むか、webrtcvadをインストールしてください)")
+            return
+        self._webrtc_vad = webrtcvad.Vad(self.WEBRTC_VAD_MODE)
+        print("webrtcvadを使用します")
+    
+    def _has_speech(self, audio_data: np.ndarray) -> bool:
+        """VADで一定時間以上の発話が含まれるかを判定"""
+        if self._vad_model is not None:
+            return bool(self._get_speech_timestamps(
+                torch.from_numpy(audio_data), self._vad_model,
+                sampling_rate=self.sample_rate, min_speech_duration_ms=self.VAD_MIN_SPEECH_MS
+            ))
+        
+        # webrtcvadは16bit PCMを固定長フレームで判定する
+        pcm = (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        frame_bytes = self.sample_rate * self.WEBRTC_VAD_FRAME_MS // 1000 * 2
+        voiced = sum(
+            self._webrtc_vad.is_speech(pcm[i:i + frame_bytes], self.sample_rate)
+            for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+        )
+        return voiced * self.WEBRTC_VAD_FRAME_MS >= self.VAD_MIN_SPEECH_MS
+    
+    def _init_gpu_audio_buffers(self, device: str):
+        """GPU上でメルを計算するための転送用バッファと窓関数を事前確保"""
+        # 30秒分の音声転送用バッファ（ページロックされたホスト側と、デバイス側を1つずつ）
+        self._audio_host = torch.empty(whisper.audio.N_SAMPLES, dtype=torch.float32, pin_memory=True)
+        self._audio_host_np = self._audio_host.numpy()
+        self._audio_dev = torch.zeros(whisper.audio.N_SAMPLES, dtype=torch.float32, device=device)
+        
+        # 転送専用のCUDAストリームと、転送完了を示すイベント（ホスト側バッファの再利用判定に使用）
+        self._copy_stream = torch.cuda.Stream(device=device)
+        self._copy_done = torch.cuda.Event()
+        self._copy_done.record(self._copy_stream)
+        
+        # whisper.log_mel_spectrogramは呼び出しごとに窓関数を作成してGPUへ転送するため、GPU上に保持しておく
+        self._mel_window = torch.hann_window(whisper.audio.N_FFT, device=device)
+    
+    def _log_mel_gpu(self, audio_data: np.ndarray, n_mels: int) -> torch.Tensor:
+        """
+        音声をGPUへ転送し、30秒にパディングしてlog-melスペクトログラムを計算
+        
+        whisper.log_mel_spectrogramと同じ計算を、事前確保したバッファと窓関数で行う
+        （30秒を超える音声は呼び出し元で _transcribe_windows により区切っておくこと）
+        """
+        # 前回の転送が終わるまでホスト側バッファは上書きしない（計算の完了までは待たない）
+        self._copy_done.synchronize()
+        n = min(len(audio_data), whisper.audio.N_SAMPLES)
+        self._audio_host_np[:n] = audio_data[:n]
+        
+        # ピン留めバッファから転送用ストリームで非同期転送し、残りをゼロ埋めして30秒にパディング
+        # （デバイス側バッファは前回の計算が読み終えてから書き込み、計算はこの転送の完了を待つ）
+        compute_stream = torch.cuda.current_stream()
+        self._copy_stream.wait_stream(compute_stream)
+        with torch.cuda.stream(self._copy_stream):
+            self._audio_dev[:n].copy_(self._audio_host[:n], non_blocking=True)
+            self._audio_dev[n:].zero_()
+            self._copy_done.record()
+        compute_stream.wait_stream(self._copy_stream)
+        
+        stft = torch.stft(
+            self._audio_dev, whisper.audio.N_FFT, whisper.audio.HOP_LENGTH,
+            window=self._mel_window, return_complex=True
+        )
+        magnitudes = stft[..., :-1].abs() ** 2
+        mel_spec = whisper.audio.mel_filters(self._audio_dev.device, n_mels) @ magnitudes
+        
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+    
+    def _convert_to_fp16(self):
+        """モデルの重みをFP16に変換（Tensor Coreで行列演算を実行）"""
+        self.model = self.model.half()
+        
+        # WhisperのLayerNormは入力をFP32にして計算するため、重みもFP32のままにしておく
+        for module in self.model.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()
+    
+    def _capture_encoder_graph(self):
+        """WhisperエンコーダーのforwardをCUDAグラフとしてキャプチャ（以降はreplayで実行）"""
+        # 入力メルは常に固定長(30秒)なので、cuDNNに最適なカーネルを選ばせる
+        torch.backends.cudnn.benchmark = True
+        
+        try:
+            self.model.encoder = _CudaGraphEncoder(self.model.encoder, self.model.dims)
+            print("エンコーダーをCUDAグラフとしてキャプチャしました")
+        except Exception as e:
+            print(f"エンコーダーのCUDAグラフキャプチャをスキップしました: {e}")
+    
+    def _warmup(self):
+        """ダミー音声で認識を実行し、初回実行時の初期化（cuBLAS・メモリ確保など）を最初のチャンクで発生させない"""
+        print("ウォームアップ中...")
+        start = time.time()
+        try:
+            # 入力は常に30秒にパディングされるので、音声長によらず同じグラフが再利用される
+            # タイムスタンプあり・なしでデコーダーの入力が変わるため、両方を一度ずつ実行しておく
+            audio = np.zeros(whisper.audio.N_SAMPLES, dtype=np.float32)
+            self._transcribe_gpu(audio, without_timestamps=True)
+            self._transcribe_gpu(audio, without_timestamps=False)
+            print(f"ウォームアップ完了 ({time.time() - start:.1f}秒)")
+        except Exception as e:
+            print(f"ウォームアップエラー: {e}")
+    
     def list_audio_devices(self):
         """利用可能な音声デバイスを一覧表示"""
         print("\n利用可能な音声デバイス:")
@@ -80,46 +735,58 @@ class RealTimeVoiceRecognizer:
     
     def audio_callback(self, in_data, frame_count, time_info, status):
         """音声コールバック関数"""
-        audio_data = np.frombuffer(in_data, dtype=np.float32)
-        
-        # キューに音声データを追加
-        try:
-            self.audio_queue.put_nowait(audio_data)
-        except queue.Full:
-            # キューが満杯の場合は古いデータを削除
-            try:
-                self.audio_queue.get_nowait()
-                self.audio_queue.put_nowait(audio_data)
-            except queue.Empty:
-                pass
-        
+        self._enqueue_audio(np.frombuffer(in_data, dtype=np.float32))
         return (None, pyaudio.paContinue)
     
+    def _sounddevice_callback(self, indata, frames, time_info, status):
+        """sounddeviceの音声コールバック関数（indataはfloat32のNumPy配列）"""
+        # indataはコールバック終了後に再利用されるのでコピーして保持する
+        self._enqueue_audio(indata[:, 0].copy())
+    
+    def _enqueue_audio(self, audio_data: np.ndarray):
+        """キューに音声データを追加（満杯の場合は最も古いデータが自動的に削除される）"""
+        if len(self.audio_queue) == self.audio_queue.maxlen:
+            self._dropped_samples += len(self.audio_queue[0])
+        self.audio_queue.append(audio_data)
+        
+        # Event.set()は内部でロックを取るため、既に通知済みなら呼ばない
+        # （is_set()はフラグを読むだけ。追加後に確認するので、処理側のclear()後の追加は必ず通知される）
+        if not self._audio_ready.is_set():
+            self._audio_ready.set()
+    
     def start_recording(self, device_index: Optional[int] = None):
         """録音開始"""
         try:
-            # デフォルトデバイスの情報を取得
+            # デバイスの情報を取得（デバイス番号はPyAudioの番号）
             if device_index is None:
                 device_info = self.audio.get_default_input_device_info()
-                device_index = device_info['index']
             else:
                 device_info = self.audio.get_device_info_by_index(device_index)
             
             print(f"使用デバイス: {device_info['name']}")
             
-            # 音声ストリーム開始
-            self.stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=1024,
-                stream_callback=self.audio_callback
-            )
+            if self.capture in ("rtmixer", "sounddevice"):
+                # sounddevice/rtmixerは独自のPortAudioを使うためデバイス番号がPyAudioと一致するとは限らない
+                # 未指定ならデフォルトデバイスの選択を任せ、指定時は同名のデバイスを探す
+                device = None if device_index is None else self._sounddevice_device(device_info)
+                if self.capture == "rtmixer":
+                    self._start_rtmixer(device)
+                else:
+                    self._start_sounddevice(device)
+            else:
+                # 音声ストリーム開始
+                self.stream = self.audio.open(
+                    format=self.format,
+                    channels=self.channels,
+                    rate=self.sample_rate,
+                    input=True,
+                    input_device_index=device_index,
+                    frames_per_buffer=self.CALLBACK_FRAMES,
+                    stream_callback=self.audio_callback
+                )
+                self.stream.start_stream()
             
             self.is_recording = True
-            self.stream.start_stream()
             print("録音開始...")
             
         except Exception as e:
@@ -129,75 +796,412 @@ class RealTimeVoiceRecognizer:
         
         return True
     
+    def _sounddevice_device(self, device_info: dict) -> int:
+        """PyAudioのデバイス情報に対応するsounddevice側のデバイス番号（同名の入力デバイス、なければPyAudioの番号）"""
+        import sounddevice
+        
+        for index, info in enumerate(sounddevice.query_devices()):
+            if info['name'] == device_info['name'] and info['max_input_channels'] > 0:
+                return index
+        return device_info['index']
+    
+    def _start_rtmixer(self, device_index: Optional[int]):
+        """rtmixerで録音開始（PortAudioのCコールバックがリングバッファに直接書き込む）"""
+        import rtmixer
+        
+        elementsize = np.dtype(np.float32).itemsize * self.channels
+        self._ringbuffer = rtmixer.RingBuffer(elementsize, self.RTMIXER_RINGBUFFER_SIZE)
+        self.stream = rtmixer.Recorder(
+            device=device_index,
+            channels=self.channels,
+            blocksize=self.CALLBACK_FRAMES,
+            samplerate=self.sample_rate,
+            dtype='float32'
+        )
+        self.stream.start()
+        self.stream.record_ringbuffer(self._ringbuffer)
+    
+    def _start_sounddevice(self, device_index: Optional[int]):
+        """sounddeviceで録音開始（コールバックにはfloat32のNumPy配列が直接渡される）"""
+        import sounddevice
+        
+        self.stream = sounddevice.InputStream(
+            device=device_index,
+            channels=self.channels,
+            blocksize=self.CALLBACK_FRAMES,
+            samplerate=self.sample_rate,
+            dtype='float32',
+            callback=self._sounddevice_callback
+        )
+        self.stream.start()
+    
     def stop_recording(self):
         """録音停止"""
         if self.is_recording:
             self.is_recording = False
-            self.stream.stop_stream()
+            # 音声待ちの処理スレッドを起こし、停止フラグを確認させる
+            self._audio_ready.set()
+            if self.capture in ("rtmixer", "sounddevice"):
+                self.stream.stop()
+            else:
+                self.stream.stop_stream()
             self.stream.close()
             print("録音停止")
     
+    def start_processing(self):
+        """処理スレッドを開始（前回の処理スレッドが残っていれば終了を待ってから開始）"""
+        self.stop_processing()
+        self.is_processing = True
+        self._processing_thread = threading.Thread(target=self.processing_thread)
+        self._processing_thread.daemon = True
+        self._processing_thread.start()
+    
+    def stop_processing(self):
+        """処理スレッドを停止し、終了を待つ（認識中のチャンクがあれば認識が終わるまで待つ）"""
+        self.is_processing = False
+        # 音声待ちの処理スレッドを起こし、停止フラグを確認させる
+        self._audio_ready.set()
+        thread = self._processing_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._processing_thread = None
+    
     def process_audio_chunk(self, audio_data: np.ndarray) -> str:
         """音声チャンクを処理して文字起こし"""
+        segments = self._process_audio_segments(audio_data)
+        return "".join(text for _, text in segments).strip()
+    
+    def _process_audio_segments(self, audio_data: np.ndarray) -> list:
+        """
+        音声を処理してセグメント単位で文字起こし
+        
+        Returns:
+            list: (セグメント終了位置[秒], テキスト) のリスト（無音・エラー時は空）
+        """
         try:
-            # 音声の正規化
-            audio_data = audio_data.astype(np.float32)
-            
-            # 無音チェック（閾値以下は処理しない）
-            if np.abs(audio_data).mean() < 0.001:
-                # print("audio_data is silent, skipping transcription.")
-                return ""
+            # 音声の正規化（コールバックが既にfloat32を生成しているのでその場合はコピーしない）
+            audio_data = np.asarray(audio_data, dtype=np.float32)
             
-            # Whisperで音声認識
-            result = self.model.transcribe(
-                audio_data,
-                language="ja",  # 日本語に設定
-                task="transcribe"
+            # 無音チェック（プリエンファシス後のRMSが環境ノイズの推定値の数倍以下は処理しない）
+            n = audio_data.shape[0]
+            if n == 0:
+                return []
+            if n > self._scratch.shape[0]:
+                self._scratch = np.empty(n, dtype=np.float32)
+            energy, self._preemphasis_prev = _preemphasis_energy(
+                audio_data, self._scratch[:n], self._preemphasis_prev
             )
+            rms = float(np.sqrt(energy / n))
+            noise_floor = self._noise_floor()
+            self._update_noise_floor(self._scratch[:n])
+            if rms < max(self.NOISE_FLOOR_RATIO * noise_floor, self.SILENCE_THRESHOLD):
+                # print("audio_data is silent, skipping transcription.")
+                return []
             
-            return result["text"].strip()
+            # 発話チェック（ファンやキーボード等のノイズのみのチャンクは処理しない）
+            if (self._vad_model is not None or self._webrtc_vad is not None) and not self._has_speech(audio_data):
+                return []
             
+            # Whisperで音声認識
+            return self._transcribe(audio_data)
+        
         except Exception as e:
             print(f"音声処理エラー: {e}")
-            return ""
+            return []
+    
+    def _noise_floor(self) -> float:
+        """環境ノイズのRMS推定値（直近のチャンクの推定値の最小値、上限あり）"""
+        if not self._recent_noise:
+            return self.SILENCE_THRESHOLD
+        return min(min(self._recent_noise), self.NOISE_FLOOR_MAX)
+    
+    def _update_noise_floor(self, emphasized: np.ndarray):
+        """
+        プリエンファシス後のチャンクから環境ノイズを推定して記録
+        
+        短いフレームごとのRMSのうち静かなもの（下位パーセンタイル）をノイズとみなすため、
+        発話中のチャンクでも単語間の無音部分から推定でき、発話の音量では推定値が上がらない
+        """
+        frame = self.sample_rate * self.NOISE_FRAME_MS // 1000
+        n_frames = len(emphasized) // frame
+        if n_frames == 0:
+            return
+        frames = emphasized[:n_frames * frame].reshape(n_frames, frame)
+        energies = np.einsum('ij,ij->i', frames, frames) / frame
+        k = n_frames * self.NOISE_FRAME_PERCENTILE // 100
+        self._recent_noise.append(float(np.sqrt(np.partition(energies, k)[k])))
+    
+    def _transcribe(self, audio_data: np.ndarray) -> list:
+        """バックエンドに応じて音声認識を実行し、(終了位置[秒], テキスト) のリストを返す"""
+        if self.model_server_port is not None:
+            return self.model.transcribe_segments(audio_data)
+        
+        # GPU上でメルを計算するバックエンドは入力が30秒固定なので、超える分は30秒ごとに区切って認識する
+        if len(audio_data) > whisper.audio.N_SAMPLES and (
+            self.backend == "trt" or (self.backend == "whisper" and self.device == "cuda")
+        ):
+            return self._transcribe_windows(audio_data, self._transcribe)
+        
+        # 1チャンク分ならチャンク内の区間情報は不要なので、タイムスタンプトークンを生成しない（デコード長を短縮）
+        without_timestamps = len(audio_data) <= self.chunk_size
+        
+        if self.backend == "faster-whisper":
+            segments, _ = self.model.transcribe(
+                audio_data,
+                language="ja",
+                beam_size=1,
+                temperature=0.0,  # 失敗時の温度を上げた再デコードを行わない
+                condition_on_previous_text=False,
+                without_timestamps=without_timestamps,
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=500)
+            )
+            # segmentsはジェネレーターなので、ここで認識処理が実行される
+            return [(segment.end, segment.text.strip()) for segment in segments if segment.text.strip()]
+        
+        if self.backend == "trt":
+            # TensorRT-LLMは区間情報を返さないため、音声全体を1セグメントとして扱う
+            text = self.model.transcribe(audio_data, language="ja")["text"]
+            return [(len(audio_data) / self.sample_rate, text)] if text else []
+        
+        if self.backend == "onnx":
+            # タイムスタンプなしで生成するため、音声全体を1セグメントとして扱う
+            text = self._transcribe_onnx(audio_data)
+            return [(len(audio_data) / self.sample_rate, text)] if text else []
+        
+        if self.backend == "openvino":
+            # タイムスタンプなしで生成するため、音声全体を1セグメントとして扱う
+            result = self.model.generate(audio_data, language="<|ja|>", task="transcribe")
+            text = result.texts[0].strip()
+            return [(len(audio_data) / self.sample_rate, text)] if text else []
+        
+        if self.device == "cuda":
+            return self._transcribe_gpu(audio_data, without_timestamps)
+        
+        result = self.model.transcribe(audio_data, without_timestamps=without_timestamps, **self._transcribe_options)
+        return [(segment["end"], segment["text"].strip()) for segment in result["segments"] if segment["text"].strip()]
+    
+    def _transcribe_windows(self, audio_data: np.ndarray, transcribe) -> list:
+        """30秒ごとに区切って認識し、各区間の終了位置を音声全体での位置に直して連結"""
+        segments = []
+        for start in range(0, len(audio_data), whisper.audio.N_SAMPLES):
+            offset = start / whisper.audio.SAMPLE_RATE
+            window = audio_data[start:start + whisper.audio.N_SAMPLES]
+            segments.extend((offset + end, text) for end, text in transcribe(window))
+        return segments
+    
+    def _transcribe_gpu(self, audio_data: np.ndarray, without_timestamps: bool = True) -> list:
+        """
+        GPU上でメルを計算し、DecodingTaskで直接デコード
+        
+        transcribe()はCPUでパディング・メル計算を行ってからGPUへ転送するため、
+        音声波形だけを転送してSTFT・メル計算をcuFFTで行う（入力は30秒以内の前提）
+        """
+        mel = self._log_mel_gpu(audio_data, self.model.dims.n_mels)
+        task = self._decoding_task_no_ts if without_timestamps else self._decoding_task
+        result = task.run(mel.unsqueeze(0))[0]
+        return self._segments_from_result(result, len(audio_data) / whisper.audio.SAMPLE_RATE)
+    
+    def _transcribe_gpu_batch(self, audio_list: list) -> list:
+        """
+        複数の音声をまとめてGPU上でデコード（共有モデルサーバーで同時に届いた要求用）
+        
+        Returns:
+            list: 音声ごとの (終了位置[秒], テキスト) のリスト
+        """
+        mels = []
+        for audio_data in audio_list:
+            mels.append(self._log_mel_gpu(audio_data, self.model.dims.n_mels))
+        
+        without_timestamps = all(len(audio_data) <= self.chunk_size for audio_data in audio_list)
+        task = self._decoding_task_no_ts if without_timestamps else self._decoding_task
+        results = task.run(torch.stack(mels))
+        return [
+            self._segments_from_result(result, len(audio_data) / whisper.audio.SAMPLE_RATE)
+            for result, audio_data in zip(results, audio_list)
+        ]
+    
+    def _segments_from_result(self, result, duration: float) -> list:
+        """デコード結果を (終了位置[秒], テキスト) のリストに変換"""
+        # transcribe()と同じ基準で無音区間（ハルシネーション）を除外
+        if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+            return []
+        
+        # タイムスタンプトークン（0.02秒単位）で区切ってセグメントに分割
+        tokenizer = self._tokenizer
+        segments = []
+        tokens = []
+        for token in result.tokens:
+            if token < tokenizer.timestamp_begin:
+                tokens.append(token)
+                continue
+            if tokens:
+                end = (token - tokenizer.timestamp_begin) * whisper.audio.N_SAMPLES_PER_TOKEN / whisper.audio.SAMPLE_RATE
+                segments.append((end, tokenizer.decode(tokens).strip()))
+                tokens = []
+        if tokens:
+            segments.append((duration, tokenizer.decode(tokens).strip()))
+        return [(end, text) for end, text in segments if text]
+    
+    def _transcribe_onnx(self, audio_data: np.ndarray) -> str:
+        """ONNX Runtimeで音声認識（メル計算→エンコーダー→貪欲デコード）"""
+        features = self._onnx_processor(
+            audio_data, sampling_rate=self.sample_rate, return_tensors="pt"
+        ).input_features
+        
+        # メルを一度だけデバイスへ転送し、以降はIOバインディングでGPU上のまま受け渡す
+        features = features.to(self.device)
+        with torch.no_grad():
+            output_ids = self.model.generate(
+                features,
+                language="ja",
+                task="transcribe",
+                max_new_tokens=self.ONNX_MAX_NEW_TOKENS
+            )
+        return self._onnx_processor.batch_decode(output_ids, skip_special_tokens=True)[0].strip()
     
     def processing_thread(self):
         """音声処理スレッド"""
-        audio_buffer = np.array([], dtype=np.float32)
+        self._ring_w = 0
+        batch_size = self.chunk_size * self.MAX_BACKLOG_CHUNKS
         
         while self.is_processing:
             try:
-                # キューから音声データを取得
-                chunk = self.audio_queue.get(timeout=0.1)
-                audio_buffer = np.concatenate([audio_buffer, chunk])
+                # キュー（またはリングバッファ）から音声データを取得
+                chunk = self._read_audio()
                 
-                # バッファが十分溜まったら処理
-                if len(audio_buffer) >= self.chunk_size:
-                    # 処理用データを切り出し
-                    process_data = audio_buffer[:self.chunk_size]
-                    audio_buffer = audio_buffer[self.chunk_size:]
-                    
-                    # 文字起こし実行
-                    text = self.process_audio_chunk(process_data)
+                # 認識が追いつかずに古い音声を破棄していれば警告
+                if self._dropped_samples:
+                    dropped, self._dropped_samples = self._dropped_samples, 0
+                    print(f"[警告] 認識が追いつかないため古い音声を{dropped / self.sample_rate:.1f}秒分破棄しました")
+                
+                # 事前確保したバッファに書き込み、最大バッチ分溜まったら処理
+                offset = 0
+                while offset < len(chunk):
+                    n = min(len(chunk) - offset, len(self._ring) - self._ring_w)
+                    self._ring[self._ring_w:self._ring_w + n] = chunk[offset:offset + n]
+                    self._ring_w += n
+                    offset += n
                     
-                    # 結果表示と蓄積
-                    if text:
-                        timestamp = time.strftime("%H:%M:%S")
-                        print(f"[{timestamp}] {text}")
-                        
-                        # 認識結果をリストに蓄積
-                        with self.text_lock:
-                            self.recognized_texts.append({
-                                'text': text,
-                                'timestamp': timestamp,
-                                'time': time.time()
-                            })
+                    if self._ring_w >= batch_size:
+                        self._flush_ring()
+                
+                # 1チャンク以上溜まっていて未処理の音声が残っていなければ処理
+                # （認識が追いついていない間は溜まった分をまとめて1回で認識する）
+                if self._ring_w >= self.chunk_size and not self._has_pending_audio():
+                    self._flush_ring()
                 
             except queue.Empty:
                 continue
             except Exception as e:
                 print(f"処理スレッドエラー: {e}")
     
+    def _flush_ring(self):
+        """バッファからチャンク単位（最大MAX_BACKLOG_CHUNKS個）で切り出して認識"""
+        n_chunks = min(self._ring_w // self.chunk_size, self.MAX_BACKLOG_CHUNKS)
+        size = n_chunks * self.chunk_size
+        
+        # バッファ上のビューのまま認識し（認識は同じスレッドで同期的に終わるのでコピー不要）、
+        # その後で残りをバッファ先頭に詰める
+        self._recognize_and_store(self._ring[:size])
+        remaining = self._ring_w - size
+        self._ring[:remaining] = self._ring[size:self._ring_w]
+        self._ring_w = remaining
+    
+    def _has_pending_audio(self) -> bool:
+        """未読み出しの録音データが残っているか"""
+        if self.capture == "rtmixer":
+            return self._ringbuffer.read_available > 0
+        return len(self.audio_queue) > 0
+    
+    def _recognize_and_store(self, process_data: np.ndarray):
+        """音声（1つ以上のチャンク）を文字起こしし、チャンクごとに結果を蓄積"""
+        # 文字起こし実行
+        segments = self._process_audio_segments(process_data)
+        if not segments:
+            return
+        
+        # セグメントを終了位置に応じて元の3秒チャンクごとにまとめる
+        n_chunks = max(1, len(process_data) // self.chunk_size)
+        grouped = [[] for _ in range(n_chunks)]
+        for end, text in segments:
+            index = min(int(end // self.chunk_duration), n_chunks - 1)
+            grouped[index].append(text)
+        
+        # 最後のチャンクを現在時刻とし、それ以前のチャンクはチャンク長ずつ遡った時刻とする
+        now = time.time()
+        with self.text_lock:
+            last_time = self._times[self._n - 1] if self._n else 0.0
+            for index, texts in enumerate(grouped):
+                if not texts:
+                    continue
+                text = "".join(texts)
+                # 蓄積済みの結果より前の時刻にはならないようにする（時系列順を維持）
+                text_time = max(now - (n_chunks - 1 - index) * self.chunk_duration, last_time)
+                last_time = text_time
+                timestamp = time.strftime("%H:%M:%S", time.localtime(text_time))
+                
+                # 結果表示と蓄積
+                print(f"[{timestamp}] {text}")
+                self._append_text(text, timestamp, text_time)
+    
+    def _append_text(self, text: str, timestamp: str, text_time: float):
+        """音声認識結果を1件追加（text_lock取得済みで呼び出すこと）"""
+        if self._n == self.TEXT_BUFFER_MAX_SIZE:
+            # 上限に達したら古いものをまとめて破棄（1件ずつ詰めるより移動回数が少ない）
+            drop = self.TEXT_BUFFER_MAX_SIZE // 10
+            self._times[:self._n - drop] = self._times[drop:self._n].copy()
+            del self._texts[:drop]
+            del self._timestrs[:drop]
+            self._n -= drop
+        elif self._n == len(self._times):
+            self._times = np.resize(self._times, min(2 * self._n, self.TEXT_BUFFER_MAX_SIZE))
+        self._times[self._n] = text_time
+        self._texts.append(text)
+        self._timestrs.append(timestamp)
+        self._n += 1
+    
+    def _search_since(self, since_timestamp: Optional[float]) -> int:
+        """since_timestampより後の最初の結果の位置を二分探索（text_lock取得済みで呼び出すこと）"""
+        if since_timestamp is None:
+            return 0
+        return int(np.searchsorted(self._times[:self._n], since_timestamp, side='right'))
+    
+    def _build_texts(self, start: int, end: int) -> list:
+        """指定範囲の音声認識結果を辞書のリストとして作成（text_lock取得済みで呼び出すこと）"""
+        return [
+            {'text': self._texts[i], 'timestamp': self._timestrs[i], 'time': float(self._times[i])}
+            for i in range(start, end)
+        ]
+    
+    def _read_audio(self) -> np.ndarray:
+        """録音済みの音声データを取得（データがない場合はqueue.Emptyを送出）"""
+        if self.capture == "rtmixer":
+            # リングバッファに溜まった分をまとめて読み出す
+            available = self._ringbuffer.read_available
+            if available == 0:
+                time.sleep(0.05)
+                raise queue.Empty
+            
+            # 未処理の音声が上限を超えていれば古い方を読み飛ばす
+            max_backlog = self.MAX_BACKLOG_CHUNKS * self.chunk_size
+            if available > max_backlog:
+                self._dropped_samples += self._ringbuffer.advance_read_index(available - max_backlog)
+                available = max_backlog
+            return np.frombuffer(self._ringbuffer.read(available), dtype=np.float32)
+        
+        try:
+            return self.audio_queue.popleft()
+        except IndexError:
+            pass
+        
+        # 通知をリセットしてから再確認し、コールバックが追加するまで待機
+        # （停止フラグを確認するため一定時間で起きる）
+        self._audio_ready.clear()
+        if not self.audio_queue:
+            self._audio_ready.wait(timeout=1.0)
+        raise queue.Empty
+    
     def run(self, device_index: Optional[int] = None):
         """メイン実行"""
         print("\n=== リアルタイム音声認識システム ===")
@@ -208,22 +1212,21 @@ class RealTimeVoiceRecognizer:
             return
         
         # 処理スレッド開始
-        self.is_processing = True
-        processing_thread = threading.Thread(target=self.processing_thread)
-        processing_thread.daemon = True
-        processing_thread.start()
+        self.start_processing()
         
         try:
-            # メインループ
-            while True:
-                time.sleep(0.1)
+            # Ctrl+Cまで待機（Windowsではタイムアウトなしの待機中はCtrl+Cが届かないため一定間隔で起きる）
+            self._stop_event.clear()
+            while not self._stop_event.wait(timeout=1.0):
+                pass
                 
         except KeyboardInterrupt:
             print("\n\n終了中...")
             
         finally:
             # クリーンアップ
-            self.is_processing = False
+            self._stop_event.set()
+            self.stop_processing()
             self.stop_recording()
             self.audio.terminate()
             print("システム終了")
@@ -241,21 +1244,21 @@ class RealTimeVoiceRecognizer:
         """
         with self.text_lock:
             # まず時刻でフィルタリング
-            if since_timestamp is not None:
-                filtered_texts = [item for item in self.recognized_texts if item['time'] > since_timestamp]
-            else:
-                filtered_texts = self.recognized_texts.copy()
+            start = self._search_since(since_timestamp)
             
             # 次に件数制限を適用（最新のN件）
             if limit is not None and limit > 0:
-                filtered_texts = filtered_texts[-limit:]
+                start = max(start, self._n - limit)
             
-            return filtered_texts
+            return self._build_texts(start, self._n)
     
     def clear_texts(self) -> None:
         """蓄積された音声認識結果をクリア"""
         with self.text_lock:
-            self.recognized_texts.clear()
+            # clear()で要素を1つずつ解放せず、新しいリストに差し替える
+            self._texts = []
+            self._timestrs = []
+            self._n = 0
     
     def get_and_clear_recent_texts(self, since_timestamp: Optional[float] = None) -> list:
         """
@@ -268,15 +1271,19 @@ class RealTimeVoiceRecognizer:
             list: 音声認識結果のリスト
         """
         with self.text_lock:
-            if since_timestamp is None:
-                result = self.recognized_texts.copy()
-                self.recognized_texts.clear()
-                return result
+            start = self._search_since(since_timestamp)
+            recent_texts = self._build_texts(start, self._n)
+            
+            # since_timestamp以降のものを削除（時刻は昇順なので末尾を切り詰めるだけでよい）
+            # 全件の場合は切り詰めずに新しいリストに差し替える
+            if start == 0:
+                self._texts = []
+                self._timestrs = []
             else:
-                recent_texts = [item for item in self.recognized_texts if item['time'] > since_timestamp]
-                # since_timestamp以降のものを削除
-                self.recognized_texts = [item for item in self.recognized_texts if item['time'] <= since_timestamp]
-                return recent_texts
+                del self._texts[start:]
+                del self._timestrs[start:]
+            self._n = start
+            return recent_texts
 
     def __del__(self):
         """デストラクタ"""
@@ -284,23 +1291,179 @@ class RealTimeVoiceRecognizer:
             self.audio.terminate()
 
 
+class _ModelManager(BaseManager):
+    """共有モデルを公開・取得するためのマネージャー"""
+
+
+class SharedModelServer:
+    """読み込み済みのモデルをローカルの他プロセスと共有するサーバー"""
+    
+    # 共有モデルサーバーのデフォルトポート（127.0.0.1でのみ待ち受ける）
+    DEFAULT_PORT = 50051
+    
+    # 認証キーの保存先（起動ごとにランダム生成し、本人のみ読み書きできるファイルに保存）と、
+    # キーを直接指定する環境変数（16進文字列）
+    # （サーバーはクライアントから受け取ったデータをunpickleするため、固定のキーは使わない）
+    AUTHKEY_DIR = os.path.expanduser("~/.cache/whisper_model_server")
+    AUTHKEY_ENV = "WHISPER_MODEL_SERVER_AUTHKEY"
+    
+    # 同時に届いた要求をまとめる待ち時間（秒）と、1回にまとめる最大件数
+    BATCH_WINDOW = 0.03
+    MAX_BATCH_SIZE = 8
+    
+    def __init__(self, recognizer: RealTimeVoiceRecognizer, port: int = DEFAULT_PORT):
+        """
+        サーバー初期化
+        
+        Args:
+            recognizer: モデルを読み込み済みの音声認識インスタンス
+            port: 待ち受けポート
+        """
+        self.recognizer = recognizer
+        self.port = port
+        
+        # 複数クライアントからの推論要求を1つのモデルで順番に処理する
+        self._lock = threading.Lock()
+        
+        # openai-whisper (CUDA) では、同時に届いた要求をまとめて1回でデコードする
+        self._batch_queue = None
+        if recognizer.backend == "whisper" and recognizer.device == "cuda" and recognizer.model_server_port is None:
+            self._batch_queue = queue.Queue()
+            batch_thread = threading.Thread(target=self._batch_worker)
+            batch_thread.daemon = True
+            batch_thread.start()
+    
+    def transcribe_segments(self, audio_data: np.ndarray) -> list:
+        """音声を文字起こしし、(終了位置[秒], テキスト) のリストを返す"""
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        if self._batch_queue is None:
+            with self._lock:
+                return self.recognizer._transcribe(audio_data)
+        
+        # バッチは30秒単位でデコードするため、超える音声は区切ってそれぞれバッチ処理スレッドに渡す
+        if len(audio_data) > whisper.audio.N_SAMPLES:
+            return self.recognizer._transcribe_windows(audio_data, self.transcribe_segments)
+        
+        # バッチ処理スレッドに渡して結果を待つ
+        item = {'audio': audio_data, 'done': threading.Event(), 'result': None, 'error': None}
+        self._batch_queue.put(item)
+        item['done'].wait()
+        if item['error'] is not None:
+            raise item['error']
+        return item['result']
+    
+    def _batch_worker(self):
+        """バッチ処理スレッド（最初の要求から一定時間内に届いた要求をまとめてデコード）"""
+        while True:
+            batch = [self._batch_queue.get()]
+            deadline = time.time() + self.BATCH_WINDOW
+            while len(batch) < self.MAX_BATCH_SIZE:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._batch_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                results = self.recognizer._transcribe_gpu_batch([item['audio'] for item in batch])
+                for item, segments in zip(batch, results):
+                    item['result'] = segments
+            except Exception as e:
+                for item in batch:
+                    item['error'] = e
+            
+            for item in batch:
+                item['done'].set()
+    
+    @classmethod
+    def _authkey_path(cls, port: int) -> str:
+        """ポートごとの認証キーファイルのパス"""
+        return os.path.join(cls.AUTHKEY_DIR, f"authkey_{port}")
+    
+    @classmethod
+    def _create_authkey(cls, port: int) -> bytes:
+        """認証キーを作成（環境変数で指定されていなければランダムに生成してファイルに保存）"""
+        if os.environ.get(cls.AUTHKEY_ENV):
+            return bytes.fromhex(os.environ[cls.AUTHKEY_ENV])
+        
+        authkey = os.urandom(32)
+        os.makedirs(cls.AUTHKEY_DIR, mode=0o700, exist_ok=True)
+        path = cls._authkey_path(port)
+        
+        # 既存ファイルの権限を引き継がないよう、削除してから本人のみ読み書き可能で新規作成する
+        if os.path.exists(path):
+            os.remove(path)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(authkey.hex())
+        return authkey
+    
+    @classmethod
+    def _read_authkey(cls, port: int) -> bytes:
+        """認証キーを読み込み（環境変数、なければサーバーが保存したファイルから）"""
+        if os.environ.get(cls.AUTHKEY_ENV):
+            return bytes.fromhex(os.environ[cls.AUTHKEY_ENV])
+        
+        path = cls._authkey_path(port)
+        try:
+            with open(path, "r") as f:
+                return bytes.fromhex(f.read().strip())
+        except FileNotFoundError:
+            raise RuntimeError(f"共有モデルサーバーの認証キーが見つかりません ({path})。先に --serve でサーバーを起動してください")
+    
+    def run(self):
+        """サーバー実行"""
+        _ModelManager.register("get_model", callable=lambda: self, exposed=("transcribe_segments",))
+        manager = _ModelManager(address=("127.0.0.1", self.port), authkey=self._create_authkey(self.port))
+        print(f"共有モデルサーバーを起動中... (127.0.0.1:{self.port})")
+        manager.get_server().serve_forever()
+    
+    @classmethod
+    def connect(cls, port: int = DEFAULT_PORT):
+        """共有モデルサーバーに接続し、推論用のプロキシを取得"""
+        _ModelManager.register("get_model")
+        manager = _ModelManager(address=("127.0.0.1", port), authkey=cls._read_authkey(port))
+        manager.connect()
+        print(f"共有モデルサーバーに接続しました (127.0.0.1:{port})")
+        return manager.get_model()
+
+
 class VoiceRecognitionServer:
     """音声認識WebAPIサーバー"""
     
-    def __init__(self, model_name: str = "medium", device: Optional[str] = None, host: str = "0.0.0.0", port: int = 5000):
+    # waitress使用時のリクエスト処理スレッド数
+    WSGI_THREADS = 16
+    
+    def __init__(self, model_name: str = "medium", device: Optional[str] = None, host: str = "0.0.0.0", port: int = 5000, backend: Optional[str] = None, trt_engine_dir: Optional[str] = None, capture: str = "pyaudio", onnx_model_dir: Optional[str] = None, openvino_model_dir: Optional[str] = None, openvino_device: Optional[str] = None, vad: bool = False, model_server_port: Optional[int] = None):
         """
         サーバー初期化
         
         Args:
             model_name: Whisperモデル名
             device: 使用するデバイス
+            backend: 推論バックエンド
+            trt_engine_dir: TensorRT-LLMエンジンのディレクトリ
+            capture: 音声キャプチャ方式
+            onnx_model_dir: ONNXモデルのディレクトリ
+            openvino_model_dir: OpenVINOモデルのディレクトリ
+            openvino_device: OpenVINOの推論デバイス
+            vad: Silero VADで発話を含まないチャンクを除外するか
+            model_server_port: 共有モデルサーバーのポート（指定時はモデルを読み込まない）
             host: サーバーホスト (デフォルト: 0.0.0.0)
             port: サーバーポート (デフォルト: 5000)
         """
         self.app = Flask(__name__)
         self.host = host
         self.port = port
-        self.recognizer = RealTimeVoiceRecognizer(model_name=model_name, device=device)
+        self.recognizer = RealTimeVoiceRecognizer(
+            model_name=model_name, device=device, backend=backend,
+            trt_engine_dir=trt_engine_dir, capture=capture,
+            onnx_model_dir=onnx_model_dir, openvino_model_dir=openvino_model_dir,
+            openvino_device=openvino_device, vad=vad,
+            model_server_port=model_server_port
+        )
         self.setup_routes()
         
     def setup_routes(self):
@@ -309,7 +1472,7 @@ class VoiceRecognitionServer:
         @self.app.route('/status', methods=['GET'])
         def get_status():
             """サーバー状態を取得"""
-            return jsonify({
+            return _json_response({
                 'status': 'ok',
                 'recording': self.recognizer.is_recording,
                 'processing': self.recognizer.is_processing,
@@ -324,32 +1487,29 @@ class VoiceRecognitionServer:
                 device_index = data.get('device_index')
                 
                 if self.recognizer.is_recording:
-                    return jsonify({'error': 'Already recording'}), 400
+                    return _json_response({'error': 'Already recording'}, 400)
                 
                 success = self.recognizer.start_recording(device_index=device_index)
                 if success:
-                    # 処理スレッド開始
-                    self.recognizer.is_processing = True
-                    processing_thread = threading.Thread(target=self.recognizer.processing_thread)
-                    processing_thread.daemon = True
-                    processing_thread.start()
+                    # 処理スレッド開始（停止直後で前回の処理スレッドが残っていれば終了を待つ）
+                    self.recognizer.start_processing()
                     
-                    return jsonify({'status': 'started', 'recording': True})
+                    return _json_response({'status': 'started', 'recording': True})
                 else:
-                    return jsonify({'error': 'Failed to start recording'}), 500
+                    return _json_response({'error': 'Failed to start recording'}, 500)
                     
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
         
         @self.app.route('/stop', methods=['POST'])
         def stop_recording():
             """音声認識停止"""
             try:
-                self.recognizer.is_processing = False
+                self.recognizer.stop_processing()
                 self.recognizer.stop_recording()
-                return jsonify({'status': 'stopped', 'recording': False})
+                return _json_response({'status': 'stopped', 'recording': False})
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
         
         @self.app.route('/texts', methods=['GET'])
         def get_texts():
@@ -363,21 +1523,21 @@ class VoiceRecognitionServer:
                     limit=limit
                 )
                 
-                return jsonify({
+                return _json_response({
                     'texts': texts,
                     'count': len(texts)
                 })
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
         
         @self.app.route('/texts/clear', methods=['POST'])
         def clear_texts():
             """認識されたテキストをクリア"""
             try:
                 self.recognizer.clear_texts()
-                return jsonify({'status': 'cleared'})
+                return _json_response({'status': 'cleared'})
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
         
         @self.app.route('/texts/consume', methods=['POST'])
         def consume_texts():
@@ -390,12 +1550,12 @@ class VoiceRecognitionServer:
                     since_timestamp=since_timestamp
                 )
                 
-                return jsonify({
+                return _json_response({
                     'texts': texts,
                     'count': len(texts)
                 })
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
         
         @self.app.route('/devices', methods=['GET'])
         def get_devices():
@@ -411,14 +1571,22 @@ class VoiceRecognitionServer:
                         'max_output_channels': device_info['maxOutputChannels']
                     })
                 
-                return jsonify({'devices': devices})
+                return _json_response({'devices': devices})
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}, 500)
     
     def run(self):
         """サーバー実行"""
         print(f"音声認識サーバーを起動中... (http://{self.host}:{self.port})")
-        self.app.run(host=self.host, port=self.port, threaded=True)
+        
+        # waitressがあれば本番用WSGIサーバーで起動（なければFlaskの開発用サーバー）
+        try:
+            from waitress import serve
+        except ImportError:
+            self.app.run(host=self.host, port=self.port, threaded=True)
+            return
+        
+        serve(self.app, host=self.host, port=self.port, threads=self.WSGI_THREADS, channel_timeout=30)
 
 
 class RemoteVoiceRecognizer:
@@ -434,11 +1602,23 @@ class RemoteVoiceRecognizer:
         self.server_url = server_url.rstrip('/')
         self.session = requests.Session()
         self.session.timeout = 10
-        self._last_connection_check = 0
+        
+        # ポーリング用にKeep-Alive接続を使い回す（GET系のみ接続エラー時に短い間隔で再試行）
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._last_connection_check = 0  # 最後に接続を確認できた時刻
         self._connection_check_interval = 30  # 30秒ごとに接続チェック
     
     def _handle_request_error(self, e: Exception, operation: str):
         """リクエストエラーを処理"""
+        # 次回のis_availableで接続を確認し直す
+        self._last_connection_check = 0
+        
         if isinstance(e, requests.exceptions.ConnectionError):
             print(f"[Warning] 音声認識サーバーに接続できません ({operation}): {self.server_url}")
         elif isinstance(e, requests.exceptions.Timeout):
@@ -451,7 +1631,7 @@ class RemoteVoiceRecognizer:
         try:
             response = self.session.get(f"{self.server_url}/status")
             response.raise_for_status()
-            return response.json()
+            return _json_loads(response.content)
         except Exception as e:
             self._handle_request_error(e, "状態取得")
             raise
@@ -489,7 +1669,7 @@ class RemoteVoiceRecognizer:
             
             response = self.session.get(f"{self.server_url}/texts", params=params)
             response.raise_for_status()
-            return response.json()['texts']
+            return _json_loads(response.content)['texts']
         except Exception as e:
             self._handle_request_error(e, "テキスト取得")
             return []
@@ -512,7 +1692,7 @@ class RemoteVoiceRecognizer:
             
             response = self.session.post(f"{self.server_url}/texts/consume", json=data)
             response.raise_for_status()
-            return response.json()['texts']
+            return _json_loads(response.content)['texts']
         except Exception as e:
             self._handle_request_error(e, "テキスト取得・クリア")
             return []
@@ -522,31 +1702,22 @@ class RemoteVoiceRecognizer:
         try:
             response = self.session.get(f"{self.server_url}/devices")
             response.raise_for_status()
-            return response.json()['devices']
+            return _json_loads(response.content)['devices']
         except Exception as e:
             self._handle_request_error(e, "デバイス一覧取得")
             return []
     
     def is_available(self) -> bool:
-        """サーバーが利用可能かチェック"""
+        """サーバーが利用可能かチェック（前回の確認から一定時間内は通信せず利用可能とみなす）"""
         current_time = time.time()
-        
-        # 頻繁な接続チェックを避けるため、インターバルをチェック
         if current_time - self._last_connection_check < self._connection_check_interval:
-            # 前回のチェックから時間が経っていない場合、簡易チェック
-            try:
-                response = self.session.get(f"{self.server_url}/status", timeout=3)
-                return response.status_code == 200
-            except Exception:
-                return False
+            return True
         
-        # 定期的な詳細チェック
         try:
             self.get_status()
             self._last_connection_check = current_time
             return True
         except Exception:
-            self._last_connection_check = current_time
             return False
 
 
@@ -564,6 +1735,39 @@ def main():
         choices=["cpu", "cuda"],
         help="使用デバイス (自動選択)"
     )
+    parser.add_argument(
+        "--backend",
+        choices=RealTimeVoiceRecognizer.BACKENDS,
+        help="推論バックエンド (デフォルト: faster-whisperがインストールされていればfaster-whisper、なければwhisper)"
+    )
+    parser.add_argument(
+        "--trt-engine-dir",
+        help="ビルド済みTensorRT-LLMエンジンのディレクトリ (--backend trt の場合)"
+    )
+    parser.add_argument(
+        "--onnx-model-dir",
+        help="エクスポート済みONNXモデルのディレクトリ (--backend onnx の場合)"
+    )
+    parser.add_argument(
+        "--openvino-model-dir",
+        help="エクスポート済みOpenVINOモデルのディレクトリ (--backend openvino の場合)"
+    )
+    parser.add_argument(
+        "--openvino-device",
+        choices=RealTimeVoiceRecognizer.OPENVINO_DEVICES,
+        help="OpenVINOの推論デバイス (デフォルト: CPU使用時はCPU、それ以外はGPU)"
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Silero VADで発話を含まないチャンクを認識前に除外"
+    )
+    parser.add_argument(
+        "--capture",
+        default="pyaudio",
+        choices=RealTimeVoiceRecognizer.CAPTURE_METHODS,
+        help="音声キャプチャ方式 (デフォルト: pyaudio)"
+    )
     parser.add_argument(
         "--list-devices",
         action="store_true",
@@ -572,7 +1776,7 @@ def main():
     parser.add_argument(
         "--device-index",
         type=int,
-        help="使用する音声デバイスのインデックス"
+        help="使用する音声デバイスのインデックス (--list-devices で表示されるPyAudioの番号)"
     )
     parser.add_argument(
         "--local",
@@ -590,14 +1794,51 @@ def main():
         default=5000,
         help="サーバーポート (デフォルト: 5000)"
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="モデルを読み込んで共有モデルサーバーとして起動（録音は行わない）"
+    )
+    parser.add_argument(
+        "--connect",
+        action="store_true",
+        help="モデルを読み込まず、起動済みの共有モデルサーバーで推論"
+    )
+    parser.add_argument(
+        "--model-port",
+        type=int,
+        default=SharedModelServer.DEFAULT_PORT,
+        help=f"共有モデルサーバーのポート (デフォルト: {SharedModelServer.DEFAULT_PORT})"
+    )
     
     args = parser.parse_args()
+    model_server_port = args.model_port if args.connect else None
     
-    if args.local:
+    if args.serve:
+        # 共有モデルサーバーモード
+        recognizer = RealTimeVoiceRecognizer(
+            model_name=args.model,
+            device=args.device,
+            backend=args.backend,
+            trt_engine_dir=args.trt_engine_dir,
+            onnx_model_dir=args.onnx_model_dir,
+            openvino_model_dir=args.openvino_model_dir,
+            openvino_device=args.openvino_device
+        )
+        SharedModelServer(recognizer, port=args.model_port).run()
+    elif args.local:
         # ローカルモード
         recognizer = RealTimeVoiceRecognizer(
             model_name=args.model,
-            device=args.device
+            device=args.device,
+            backend=args.backend,
+            trt_engine_dir=args.trt_engine_dir,
+            capture=args.capture,
+            onnx_model_dir=args.onnx_model_dir,
+            openvino_model_dir=args.openvino_model_dir,
+            openvino_device=args.openvino_device,
+            vad=args.vad,
+            model_server_port=model_server_port
         )
         
         # デバイス一覧表示
@@ -613,7 +1854,15 @@ def main():
             model_name=args.model,
             device=args.device,
             host=args.host,
-            port=args.port
+            port=args.port,
+            backend=args.backend,
+            trt_engine_dir=args.trt_engine_dir,
+            capture=args.capture,
+            onnx_model_dir=args.onnx_model_dir,
+            openvino_model_dir=args.openvino_model_dir,
+            openvino_device=args.openvino_device,
+            vad=args.vad,
+            model_server_port=model_server_port
         )
         
         # デバイス一覧表示